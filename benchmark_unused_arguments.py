@@ -0,0 +1,285 @@
+"""Check that Plugin.run scales with its input the way it should.
+
+Each axis generates modules of increasing size that stress one dimension of the
+analysis, times Plugin.run over them and measures its peak memory. The growth
+rate is estimated as the slope of log(cost) against log(size), and the run fails
+if it's steeper than the axis' expected complexity class allows.
+
+    python benchmark_unused_arguments.py --output results.json
+
+With --compare-pure, the module compiled by mypyc is also timed against the
+pure Python module installed alongside it, at the largest size of each axis.
+"""
+import argparse
+import ast
+import importlib.util
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from types import ModuleType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import flake8_unused_arguments
+from flake8_unused_arguments import COMPILED, Plugin
+
+
+class Axis(NamedTuple):
+    name: str
+    description: str
+    generate: Callable[[int], str]
+    sizes: Sequence[int]
+    # expected exponent of the growth, e.g. 1 for linear
+    expected: float
+
+
+def nested_functions(depth: int) -> str:
+    # the indentation limit stops functions nesting more than ~100 deep, so
+    # repeat the nest to give it measurable weight
+    lines = []
+    for i in range(depth):
+        indent = "    " * i
+        lines.append("{}def f{}(a{}, b{}):".format(indent, i, i, i))
+        lines.append("{}    x{} = a0 + a{}".format(indent, i, i))
+    lines.append("    " * depth + "return b0")
+    return "\n".join(lines * 20) + "\n"
+
+
+def nested_lambdas(depth: int) -> str:
+    # deeper than this and ast.NodeVisitor hits the recursion limit
+    lambdas = "".join("lambda a{}: ".format(i) for i in range(depth))
+    return "\n".join("f{} = {}a0".format(i, lambdas) for i in range(20)) + "\n"
+
+
+def many_arguments(count: int) -> str:
+    arguments = ", ".join("a{}".format(i) for i in range(count))
+    uses = "\n".join("    print(a{})".format(i) for i in range(0, count, 2))
+    return "def f({}):\n{}\n".format(arguments, uses)
+
+
+def many_names(count: int) -> str:
+    uses = "\n".join("    x = y{} + z".format(i) for i in range(count))
+    return "def f(a, b, c, d, e):\n{}\n    return a\n".format(uses)
+
+
+def many_decorators(count: int) -> str:
+    decorators = "\n".join("@decorator{}(a)".format(i) for i in range(count))
+    return "{}\ndef f(a, b):\n    pass\n".format(decorators)
+
+
+def many_functions(count: int) -> str:
+    function = "def f{0}(a, b, *args, c, **kwargs):\n    g = lambda d: a + d\n    return g(c)\n"
+    return "".join(function.format(i) for i in range(count))
+
+
+AXES = [
+    Axis("nesting", "depth of nested functions", nested_functions, [12, 24, 48, 96], 1),
+    Axis("lambdas", "depth of nested lambdas", nested_lambdas, [32, 64, 128, 256], 1),
+    Axis("arguments", "arguments of one function", many_arguments, [250, 500, 1000, 2000], 1),
+    Axis("names", "name loads in one function", many_names, [1000, 2000, 4000, 8000], 1),
+    Axis("decorators", "decorators on one function", many_decorators, [250, 500, 1000, 2000], 1),
+    Axis("functions", "functions in one module", many_functions, [250, 500, 1000, 2000], 1),
+]
+
+
+def measure_time(tree: ast.Module, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(Plugin(tree).run())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_memory(tree: ast.Module) -> int:
+    tracemalloc.start()
+    try:
+        list(Plugin(tree).run())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def growth(sizes: Sequence[int], costs: Sequence[float]) -> float:
+    """Estimate the exponent of the growth with a least-squares fit in log-log space."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(cost, 1e-9)) for cost in costs]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def run_axis(axis: Axis, repeat: int, tolerance: float) -> Dict[str, Any]:
+    seconds: List[float] = []
+    peak_bytes: List[int] = []
+    for size in axis.sizes:
+        tree = ast.parse(axis.generate(size))
+        seconds.append(measure_time(tree, repeat))
+        peak_bytes.append(measure_memory(tree))
+
+    time_growth = growth(axis.sizes, seconds)
+    memory_growth = growth(axis.sizes, peak_bytes)
+    limit = axis.expected + tolerance
+    return {
+        "description": axis.description,
+        "sizes": list(axis.sizes),
+        "seconds": seconds,
+        "peak_bytes": peak_bytes,
+        "expected_growth": axis.expected,
+        "time_growth": time_growth,
+        "memory_growth": memory_growth,
+        "passed": time_growth <= limit and memory_growth <= limit,
+    }
+
+
+def find_functions(module: ModuleType, tree: ast.Module) -> None:
+    module.FunctionFinder().visit(tree)
+
+
+def walk_names(module: ModuleType, tree: ast.Module) -> None:
+    finder = module.FunctionFinder()
+    finder.visit(tree)
+    for function in finder.functions:
+        module.get_unused_arguments(function)
+
+
+def run_plugin(module: ModuleType, tree: ast.Module) -> None:
+    list(module.Plugin(tree).run())
+
+
+# what's compared between the compiled and pure Python modules: finding the
+# functions, that and walking each one's names, and the whole of Plugin.run
+STAGES: Dict[str, Callable[[ModuleType, ast.Module], None]] = {
+    "finder": find_functions,
+    "names": walk_names,
+    "run": run_plugin,
+}
+
+
+def load_pure_module() -> ModuleType:
+    """Load the pure Python module installed next to the compiled one."""
+    path = os.path.join(os.path.dirname(flake8_unused_arguments.__file__), "__init__.py")
+    spec = importlib.util.spec_from_file_location("flake8_unused_arguments_pure", path)
+    if spec is None or spec.loader is None:
+        raise ImportError("can't load {}".format(path))
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses looks the module up while it's executed
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_stage(
+    stage: Callable[[ModuleType, ast.Module], None],
+    module: ModuleType,
+    tree: ast.Module,
+    repeat: int,
+) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage(module, tree)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_axis(axis: Axis, pure: ModuleType, repeat: int) -> Dict[str, Dict[str, float]]:
+    tree = ast.parse(axis.generate(axis.sizes[-1]))
+    results = {}
+    for name, stage in STAGES.items():
+        compiled_seconds = measure_stage(stage, flake8_unused_arguments, tree, repeat)
+        pure_seconds = measure_stage(stage, pure, tree, repeat)
+        results[name] = {
+            "compiled_seconds": compiled_seconds,
+            "pure_seconds": pure_seconds,
+            "speedup": pure_seconds / max(compiled_seconds, 1e-9),
+        }
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write the results to this file as JSON.")
+    parser.add_argument(
+        "--axis",
+        action="append",
+        choices=[axis.name for axis in AXES],
+        help="Only run the given axis. May be given more than once.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timings to take the best of. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.35,
+        help=(
+            "How much steeper than expected growth may be before failing, to allow "
+            "for noise. Defaults to %(default)s."
+        ),
+    )
+    parser.add_argument(
+        "--compare-pure",
+        action="store_true",
+        help="Also time the module compiled by mypyc against the pure Python one.",
+    )
+    args = parser.parse_args(argv)
+
+    pure = None
+    if args.compare_pure:
+        if not COMPILED:
+            parser.error("--compare-pure needs the module compiled by mypyc to be installed")
+        pure = load_pure_module()
+
+    results = {}
+    for axis in AXES:
+        if args.axis and axis.name not in args.axis:
+            continue
+
+        result = results[axis.name] = run_axis(axis, args.repeat, args.tolerance)
+        print(
+            "{:<12} time n^{:.2f}  memory n^{:.2f}  expected n^{:g}  {}".format(
+                axis.name,
+                result["time_growth"],
+                result["memory_growth"],
+                axis.expected,
+                "ok" if result["passed"] else "FAILED",
+            )
+        )
+        if pure is not None:
+            speedups = result["speedups"] = compare_axis(axis, pure, args.repeat)
+            print(
+                "{:<12} compiled speedup: {}".format(
+                    "",
+                    "  ".join(
+                        "{} x{:.1f}".format(name, speedup["speedup"])
+                        for name, speedup in speedups.items()
+                    ),
+                )
+            )
+
+    if args.output:
+        report = {
+            "version": Plugin.version,
+            "compiled": COMPILED,
+            "python": sys.version,
+            "platform": platform.platform(),
+            "axes": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if all(result["passed"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""Check that alternative implementations find exactly what the reference one does.
+
+Each implementation checks every file of a corpus, by default the installed
+standard library and site-packages, and its findings are compared with those
+of the reference, which walks each function on its own with
+get_unused_arguments(). Any difference, including an implementation raising an
+exception, is printed and fails the run, so that performance work can be
+checked to have no effect on what's reported. The throughput of each
+implementation is printed too.
+
+    python corpus_unused_arguments.py --engine ast-low-memory --output results.json
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import sys
+import sysconfig
+import time
+from collections import Counter
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from flake8_unused_arguments import (
+    ENGINES,
+    OPTIONS,
+    Finding,
+    FunctionFinder,
+    Options,
+    Plugin,
+    UnusedArgument,
+    get_checked_arguments,
+    get_findings,
+    get_unused_arguments,
+)
+from flake8_unused_arguments.files import find_python_files
+
+
+class Implementation(NamedTuple):
+    name: str
+    description: str
+    check: Callable[[bytes, Options, str], List[Finding]]
+    # whether it's compared when none are chosen, i.e. it should find exactly
+    # what the reference does
+    default: bool = True
+
+
+def check_per_function(source: bytes, options: Options, path: str) -> List[Finding]:
+    """Find every function, then walk each one on its own for the names it uses."""
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError as e:
+        return [Finding.from_syntax_error(path, e)]
+
+    finder = FunctionFinder(options.ignore_nested_functions)
+    finder.visit(tree)
+    findings = []
+    for function in finder.functions:
+        scope = finder.scopes[function]
+        arguments = get_checked_arguments(function, scope, options)
+        for _, argument in get_unused_arguments(function, arguments):
+            unused = UnusedArgument(function, argument, scope)
+            findings.append(Finding.from_unused_argument(path, unused))
+    return sorted(findings, key=Finding.as_lint_result)
+
+
+def make_implementation(engine: str, low_memory: bool) -> Implementation:
+    def check(source: bytes, options: Options, path: str) -> List[Finding]:
+        return get_findings(source, replace(options, engine=engine), path, low_memory=low_memory)
+
+    # the symtable engine resolves names the way Python does, so it finds some
+    # arguments used that the ast engine doesn't, and the other way around
+    default = engine != "symtable"
+    if low_memory:
+        return Implementation(
+            engine + "-low-memory",
+            "the {} engine, a chunk of statements at a time".format(engine),
+            check,
+            default,
+        )
+    return Implementation(engine, "the {} engine".format(engine), check, default)
+
+
+IMPLEMENTATIONS = [
+    Implementation(
+        "per-function", "get_unused_arguments() on each function found", check_per_function
+    )
+] + [make_implementation(engine, low_memory) for engine in ENGINES for low_memory in (False, True)]
+REFERENCE = "per-function"
+
+
+class Difference(NamedTuple):
+    path: str
+    implementation: str
+    # what only the reference found, and what only the implementation found
+    missing: List[Finding]
+    extra: List[Finding]
+    # the exception raised by the implementation, if it failed
+    error: str = ""
+
+
+class Totals:
+    def __init__(self) -> None:
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.findings = 0
+        self.differences = 0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / max(self.seconds, 1e-9)
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / max(self.seconds, 1e-9) / 1e6
+
+
+def get_default_corpus() -> List[str]:
+    paths = sysconfig.get_paths()
+    # purelib and platlib are often the same directory
+    directories = {paths["stdlib"], paths["purelib"], paths["platlib"]}
+    return sorted(directory for directory in directories if os.path.isdir(directory))
+
+
+def run_check(
+    implementation: Implementation, source: bytes, options: Options, path: str, totals: Totals
+) -> List[Finding]:
+    start = time.perf_counter()
+    try:
+        findings = implementation.check(source, options, path)
+    finally:
+        totals.seconds += time.perf_counter() - start
+        totals.files += 1
+        totals.bytes += len(source)
+    totals.findings += len(findings)
+    return findings
+
+
+def compare(
+    filenames: Sequence[str],
+    reference: Implementation,
+    implementations: Sequence[Implementation],
+    options: Options,
+    totals: Dict[str, Totals],
+) -> Iterator[Difference]:
+    """Check each file with the reference and every implementation, yielding their differences.
+
+    Files are read once and checked by each implementation in turn, so only
+    one is in memory at a time and every implementation sees the same caches.
+    """
+    for filename in filenames:
+        try:
+            with open(filename, "rb") as f:
+                source = f.read()
+        except OSError:
+            continue
+
+        try:
+            expected = Counter(
+                run_check(reference, source, options, filename, totals[reference.name])
+            )
+        except Exception as e:
+            # nothing to compare with
+            totals[reference.name].differences += 1
+            yield Difference(filename, reference.name, [], [], repr(e))
+            continue
+
+        for implementation in implementations:
+            try:
+                found = Counter(
+                    run_check(implementation, source, options, filename, totals[implementation.name])
+                )
+            except Exception as e:
+                totals[implementation.name].differences += 1
+                yield Difference(filename, implementation.name, [], [], repr(e))
+                continue
+
+            if found != expected:
+                totals[implementation.name].differences += 1
+                yield Difference(
+                    filename,
+                    implementation.name,
+                    sorted((expected - found).elements()),
+                    sorted((found - expected).elements()),
+                )
+
+
+def format_difference(difference: Difference) -> str:
+    lines = ["{} ({}):".format(difference.path, difference.implementation)]
+    if difference.error:
+        lines.append("  raised {}".format(difference.error))
+    for prefix, findings in (("-", difference.missing), ("+", difference.extra)):
+        for finding in findings:
+            lines.append(
+                "  {} {}:{}: {} in {}".format(
+                    prefix, finding.line, finding.col + 1, finding.message, finding.function
+                )
+            )
+    return "\n".join(lines)
+
+
+def format_totals(name: str, totals: Totals) -> str:
+    return "{:<22} {:>8.1f} files/s {:>7.2f} MB/s {:>8} findings {:>6} differences".format(
+        name,
+        totals.files_per_second,
+        totals.megabytes_per_second,
+        totals.findings,
+        totals.differences,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="path",
+        help="Files and directories to check. Defaults to the standard library and site-packages.",
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=[implementation.name for implementation in IMPLEMENTATIONS],
+        help=(
+            "Compare this implementation with the reference. May be given more than "
+            "once. Defaults to all of them but the symtable engine, which differs on "
+            "purpose."
+        ),
+    )
+    parser.add_argument(
+        "--reference",
+        choices=[implementation.name for implementation in IMPLEMENTATIONS],
+        default=REFERENCE,
+        help="The implementation whose findings are expected. Defaults to %(default)s.",
+    )
+    parser.add_argument("--output", help="Write the results to this file as JSON.")
+    parser.add_argument(
+        "--max-differences",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Only print the first N differences. Defaults to %(default)s.",
+    )
+    for flag, dest, _, help_text in OPTIONS:
+        parser.add_argument(flag, action="store_true", dest=dest, help=help_text)
+    args = parser.parse_args(argv)
+
+    # each implementation chooses its own engine
+    args.unused_arguments_engine = "ast"
+    options = Options.from_namespace(args)
+    by_name = {implementation.name: implementation for implementation in IMPLEMENTATIONS}
+    reference = by_name[args.reference]
+    implementations = [
+        implementation
+        for implementation in IMPLEMENTATIONS
+        if implementation.name != reference.name
+        and (implementation.name in args.engine if args.engine else implementation.default)
+    ]
+
+    paths = args.paths or get_default_corpus()
+    filenames = list(find_python_files(paths, []))
+    totals = {implementation.name: Totals() for implementation in IMPLEMENTATIONS}
+
+    differences: List[Difference] = []
+    for difference in compare(filenames, reference, implementations, options, totals):
+        if len(differences) < args.max_differences:
+            print(format_difference(difference))
+        differences.append(difference)
+
+    for implementation in [reference] + implementations:
+        print(format_totals(implementation.name, totals[implementation.name]))
+
+    if args.output:
+        report: Dict[str, Any] = {
+            "version": Plugin.version,
+            "python": sys.version,
+            "platform": platform.platform(),
+            "corpus": paths,
+            "files": len(filenames),
+            "reference": reference.name,
+            "implementations": {
+                implementation.name: {
+                    "description": implementation.description,
+                    "files_per_second": totals[implementation.name].files_per_second,
+                    "megabytes_per_second": totals[implementation.name].megabytes_per_second,
+                    "findings": totals[implementation.name].findings,
+                    "differences": totals[implementation.name].differences,
+                }
+                for implementation in [reference] + implementations
+            },
+            "differences": [
+                {
+                    "path": difference.path,
+                    "implementation": difference.implementation,
+                    "missing": [finding._asdict() for finding in difference.missing],
+                    "extra": [finding._asdict() for finding in difference.extra],
+                    "error": difference.error,
+                }
+                for difference in differences
+            ],
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if differences else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1526 @@
+import ast
+import bisect
+import fnmatch
+import functools
+import io
+import json
+import os
+import re
+import time
+import tokenize
+from dataclasses import asdict, dataclass, field, fields, replace
+from ast import NodeVisitor, Store
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+if TYPE_CHECKING:
+    import argparse
+    import symtable
+
+    import flake8.options.manager
+
+
+FunctionTypes = Union[ast.AsyncFunctionDef, ast.FunctionDef, ast.Lambda]
+LintResult = Tuple[int, int, str, str]
+
+_T = TypeVar("_T")
+
+try:
+    from mypy_extensions import mypyc_attr as mypyc_attr
+except ImportError:
+    # mypyc_attr only means something to mypyc, and compiled builds depend on
+    # mypy_extensions
+    def mypyc_attr(*attrs: str, **kwattrs: object) -> Callable[[_T], _T]:  # noqa: U100
+        return lambda cls: cls
+
+
+# whether this is the extension module built by mypyc, which is imported in
+# place of the pure Python module when both are installed
+COMPILED = not __file__.endswith(".py")
+
+# ways of finding which arguments are used
+ENGINES = ["ast", "symtable"]
+ENGINE_HELP = (
+    "How to find which arguments are used. 'ast' (the default) matches names in "
+    "each function's syntax tree, 'symtable' reads them from the symbol tables "
+    "Python compiles, which follow its scoping rules exactly."
+)
+
+# (flag, dest, Plugin attribute, help) for every option
+OPTIONS: List[Tuple[str, str, str, str]] = [
+    (
+        "--unused-arguments-ignore-abstract-functions",
+        "unused_arguments_ignore_abstract_functions",
+        "ignore_abstract",
+        "If provided, then unused arguments for functions decorated with abstractmethod will be ignored.",
+    ),
+    (
+        "--unused-arguments-ignore-overload-functions",
+        "unused_arguments_ignore_overload_functions",
+        "ignore_overload",
+        "If provided, then unused arguments for functions decorated with overload will be ignored.",
+    ),
+    (
+        "--unused-arguments-ignore-override-functions",
+        "unused_arguments_ignore_override_functions",
+        "ignore_override",
+        "If provided, then unused arguments for functions decorated with override will be ignored.",
+    ),
+    (
+        "--unused-arguments-ignore-stub-functions",
+        "unused_arguments_ignore_stub_functions",
+        "ignore_stubs",
+        "If provided, then unused arguments for functions that are only a pass statement will be ignored.",
+    ),
+    (
+        "--unused-arguments-ignore-variadic-names",
+        "unused_arguments_ignore_variadic_names",
+        "ignore_variadic_names",
+        "If provided, then unused *args and **kwargs won't produce warnings.",
+    ),
+    (
+        "--unused-arguments-ignore-lambdas",
+        "unused_arguments_ignore_lambdas",
+        "ignore_lambdas",
+        "If provided, all lambdas are ignored.",
+    ),
+    (
+        "--unused-arguments-ignore-nested-functions",
+        "unused_arguments_ignore_nested_functions",
+        "ignore_nested_functions",
+        (
+            "If provided, only functions at the top level of a module or "
+            "methods of a class in the top level of a module are checked."
+        ),
+    ),
+    (
+        "--unused-arguments-ignore-dunder",
+        "unused_arguments_ignore_dunder_methods",
+        "ignore_dunder_methods",
+        (
+            "If provided, all double-underscore methods are ignored, e.g., __new__, _init__, "
+            "__enter__, __exit__, __reduce_ex__, etc."
+        ),
+    ),
+]
+
+
+@dataclass(frozen=True)
+class Options:
+    """Which functions and arguments to leave out, see OPTIONS for descriptions."""
+
+    ignore_abstract: bool = False
+    ignore_overload: bool = False
+    ignore_override: bool = False
+    ignore_stubs: bool = False
+    ignore_variadic_names: bool = False
+    ignore_lambdas: bool = False
+    ignore_nested_functions: bool = False
+    ignore_dunder_methods: bool = False
+    engine: str = "ast"
+    # qualified names of methods that override a method of a base class, as
+    # found by a ClassIndex, which are ignored like those decorated @override
+    overrides: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_namespace(cls, namespace: "argparse.Namespace") -> "Options":
+        """Get the options from parsed command line or flake8 arguments."""
+        return cls(
+            engine=namespace.unused_arguments_engine,
+            **{attribute: getattr(namespace, dest) for _, dest, attribute, _ in OPTIONS},
+        )
+
+    def __reduce__(self) -> Tuple[Callable[..., "Options"], Tuple[object, ...]]:
+        # unpickling sets each field by default, which a frozen dataclass
+        # compiled by mypyc doesn't allow
+        return Options, tuple(getattr(self, f.name) for f in fields(self))
+
+
+PROFILES_HELP = (
+    "Extra options for files matching glob patterns, as lines (or entries separated "
+    "by ;) of 'PATTERN[,PATTERN...]: OPTION[,OPTION...]', e.g. 'tests/*: "
+    "ignore-lambdas, ignore-stub-functions'. Options are named like the flags above "
+    "without --unused-arguments-, and patterns match the name or path of each file, "
+    "like --exclude."
+)
+
+
+class Profiles:
+    """Extra options for the files matching glob patterns, e.g. tests or stubs.
+
+    The patterns of each profile are compiled into a single regular expression,
+    matched against the name and absolute path of each file the way --exclude
+    patterns are, with patterns containing a / relative to root. Every profile
+    a file matches applies, and the profiles each file matches are remembered,
+    as are the options for each combination, so looking up the options of a
+    file again is a dict lookup.
+    """
+
+    # profile option -> Options attribute, e.g. ignore-lambdas -> ignore_lambdas
+    NAMES: ClassVar[Dict[str, str]] = {
+        flag[len("--unused-arguments-"):]: attribute for flag, _, attribute, _ in OPTIONS
+    }
+
+    def __init__(
+        self, profiles: Sequence[Tuple[Sequence[str], Sequence[str]]], root: str = "."
+    ) -> None:
+        root = os.path.abspath(root)
+        self._patterns: List["re.Pattern[str]"] = []
+        self._changes: List[Dict[str, Any]] = []
+        for patterns, names in profiles:
+            unknown = [name for name in names if name not in self.NAMES]
+            if unknown:
+                raise ValueError("unknown options {}".format(", ".join(unknown)))
+            regex = "|".join(
+                fnmatch.translate(os.path.join(root, pattern) if "/" in pattern else pattern)
+                for pattern in patterns
+            )
+            self._patterns.append(re.compile(regex))
+            self._changes.append({self.NAMES[name]: True for name in names})
+
+        # absolute path -> indexes of the profiles it matches
+        self._matched: Dict[str, Tuple[int, ...]] = {}
+        self._options: Dict[Tuple[Tuple[int, ...], Options], Options] = {}
+
+    @classmethod
+    def parse(cls, value: str, root: str = ".") -> "Profiles":
+        """Parse profiles written as PROFILES_HELP describes, raising ValueError if invalid."""
+        profiles = []
+        for entry in re.split(r"[\n;]", value):
+            if not entry.strip():
+                continue
+            patterns, colon, names = entry.partition(":")
+            if not colon:
+                raise ValueError("expected PATTERNS: OPTIONS, not {!r}".format(entry.strip()))
+            profiles.append(
+                (
+                    [pattern.strip() for pattern in patterns.split(",") if pattern.strip()],
+                    [name for name in re.split(r"[\s,]+", names) if name],
+                )
+            )
+        return cls(profiles, root)
+
+    def get_options(self, filename: str, options: Options) -> Options:
+        """Get the options for a file, with those of every profile it matches added."""
+        absolute = os.path.abspath(filename)
+        matched = self._matched.get(absolute)
+        if matched is None:
+            name = os.path.basename(absolute)
+            matched = self._matched[absolute] = tuple(
+                i
+                for i, pattern in enumerate(self._patterns)
+                if pattern.match(name) or pattern.match(absolute)
+            )
+        if not matched:
+            return options
+
+        key = (matched, options)
+        resolved = self._options.get(key)
+        if resolved is None:
+            changes: Dict[str, Any] = {}
+            for i in matched:
+                changes.update(self._changes[i])
+            resolved = self._options[key] = replace(options, **changes)
+        return resolved
+
+
+_profiles: Dict[Tuple[str, str], Profiles] = {}
+
+
+def get_profiles(value: str, root: str = ".") -> Profiles:
+    """Parse profiles, reusing those parsed from the same value for the same root."""
+    key = (value, os.path.abspath(root))
+    profiles = _profiles.get(key)
+    if profiles is None:
+        profiles = _profiles[key] = Profiles.parse(value, root)
+    return profiles
+
+
+# flake8 configures the plugin by setting class attributes, which instances of
+# a class compiled by mypyc wouldn't see
+@mypyc_attr(native_class=False)
+class Plugin:
+    name = "flake8-unused-arguments"
+    version = "0.0.13"
+
+    ignore_abstract = False
+    ignore_overload = False
+    ignore_override = False
+    ignore_stubs = False
+    ignore_variadic_names = False
+    ignore_lambdas = False
+    ignore_nested_functions = False
+    ignore_dunder_methods = False
+    engine = "ast"
+
+    # if set, statistics for each file are appended to this file as JSON lines
+    statistics_file: Optional[str] = None
+    # if set, methods overriding a base class method in this ClassIndex are ignored
+    class_index_file: Optional[str] = None
+    # if set, extra options for the files matching each profile's patterns
+    profiles: Optional[Profiles] = None
+
+    def __init__(
+        self,
+        tree: ast.Module,
+        filename: str = "<unknown>",
+        lines: Optional[Sequence[str]] = None,
+        *,
+        options: Optional[Options] = None,
+        changed_lines: Optional["LineRanges"] = None,
+    ):
+        self.tree = tree
+        self.filename = filename
+        # the source, which the symtable engine compiles again
+        self.lines = lines
+        # flake8 can only configure plugins through class attributes, so those
+        # are the defaults, but nothing reads them after this, and a later
+        # parse_options() doesn't change a check that's already running
+        if options is None:
+            options = Options(
+                engine=self.engine,
+                **{attribute: getattr(self, attribute) for _, _, attribute, _ in OPTIONS},
+            )
+        self.options = options
+        self.statistics_file = type(self).statistics_file
+        self.class_index_file = type(self).class_index_file
+        self.profiles = type(self).profiles
+        # if given, only functions overlapping these lines are checked
+        self.changed_lines = changed_lines
+
+    @classmethod
+    def add_options(cls, option_manager: "flake8.options.manager.OptionManager") -> None:
+        for flag, dest, attribute, help_text in OPTIONS:
+            option_manager.add_option(
+                flag,
+                action="store_true",
+                parse_from_config=True,
+                default=getattr(cls, attribute),
+                dest=dest,
+                help=help_text,
+            )
+
+        option_manager.add_option(
+            "--unused-arguments-engine",
+            parse_from_config=True,
+            choices=ENGINES,
+            default=cls.engine,
+            dest="unused_arguments_engine",
+            help=ENGINE_HELP,
+        )
+        option_manager.add_option(
+            "--unused-arguments-statistics",
+            parse_from_config=True,
+            default=cls.statistics_file,
+            dest="unused_arguments_statistics",
+            metavar="FILE",
+            help=(
+                "If provided, timings and counts for each file checked are appended "
+                "to this file as JSON lines."
+            ),
+        )
+        option_manager.add_option(
+            "--unused-arguments-class-index",
+            parse_from_config=True,
+            default=cls.class_index_file,
+            dest="unused_arguments_class_index",
+            metavar="FILE",
+            help=(
+                "If provided, methods that override a method of a base class in this "
+                "index of classes, written by flake8-unused-arguments --class-index, "
+                "will be ignored."
+            ),
+        )
+        option_manager.add_option(
+            "--unused-arguments-profiles",
+            parse_from_config=True,
+            default="",
+            dest="unused_arguments_profiles",
+            help=PROFILES_HELP,
+        )
+
+    @classmethod
+    def parse_options(cls, options: "argparse.Namespace") -> None:
+        for _, dest, attribute, _ in OPTIONS:
+            setattr(cls, attribute, getattr(options, dest))
+        cls.engine = options.unused_arguments_engine
+        cls.statistics_file = options.unused_arguments_statistics
+        cls.class_index_file = options.unused_arguments_class_index
+        cls.profiles = None
+        if options.unused_arguments_profiles:
+            try:
+                cls.profiles = get_profiles(options.unused_arguments_profiles)
+            except (ValueError, re.error) as e:
+                from flake8.exceptions import ExecutionError
+
+                # which flake8 reports without a traceback
+                raise ExecutionError("invalid unused-arguments-profiles: {}".format(e))
+
+    def run(self) -> Iterable[LintResult]:
+        options = self.options
+        if self.profiles is not None:
+            options = self.profiles.get_options(self.filename, options)
+        if self.class_index_file is not None:
+            from flake8_unused_arguments.class_index import get_class_index
+
+            index = get_class_index(self.class_index_file)
+            options = replace(options, overrides=index.get_overrides(self.filename, self.tree))
+
+        # only the symtable engine needs the source
+        source = None
+        if self.lines is not None and options.engine == "symtable":
+            source = "".join(self.lines)
+
+        unused_arguments: Iterable[UnusedArgument]
+        if self.statistics_file is not None:
+            unused_arguments, statistics = profile(
+                self.tree, options, self.filename, self.changed_lines, source
+            )
+            statistics.write(self.statistics_file)
+        else:
+            unused_arguments = find_unused_arguments(
+                self.tree, options, self.changed_lines, source=source
+            )
+
+        for unused in unused_arguments:
+            yield make_lint_result(unused.argument)
+
+
+def check(
+    source: Union[str, bytes, ast.Module],
+    options: Optional["Options"] = None,
+    filename: str = "<unknown>",
+) -> List[LintResult]:
+    """Check the given source or module, returning the same results as the flake8 plugin.
+
+    Unlike the plugin, this doesn't need flake8 installed. SyntaxError is
+    raised if the source can't be parsed.
+    """
+    if isinstance(source, ast.Module):
+        tree = source
+        # without the source, the symtable engine falls back to the ast one
+        text = None
+    else:
+        tree = ast.parse(source, filename)
+        text = source
+
+    return [
+        make_lint_result(unused.argument)
+        for unused in find_unused_arguments(tree, options or Options(), source=text)
+    ]
+
+
+def iter_findings(
+    sources: Iterable[Tuple[str, Union[str, bytes]]],
+    options: Optional["Options"] = None,
+    on_syntax_error: Optional[Callable[[str, SyntaxError], None]] = None,
+) -> Iterator["Finding"]:
+    """Lazily check (path, source) pairs, yielding a Finding for each unused argument.
+
+    Only one source is parsed at a time, and messages aren't formatted until
+    they're asked for. Sources that can't be parsed raise SyntaxError, unless
+    on_syntax_error is given, in which case it's called with the path and the
+    error instead.
+    """
+    options = options or Options()
+    for path, source in sources:
+        try:
+            tree = ast.parse(source, path)
+        except SyntaxError as e:
+            if on_syntax_error is None:
+                raise
+            on_syntax_error(path, e)
+            continue
+
+        for unused in find_unused_arguments(tree, options, source=source):
+            yield Finding.from_unused_argument(path, unused)
+
+
+class Finding(NamedTuple):
+    """An unused argument, as reported by iter_findings()."""
+
+    path: str
+    line: int
+    col: int
+    code: str
+    argument: str
+    # qualified name of the function, e.g. Class.method.<locals>.<lambda>
+    function: str
+    # the message of a syntax error, which isn't about an argument
+    error: str = ""
+
+    @classmethod
+    def from_unused_argument(cls, path: str, unused: "UnusedArgument") -> "Finding":
+        argument = unused.argument
+        return cls(
+            path,
+            argument.lineno,
+            argument.col_offset,
+            get_error_code(argument.arg),
+            argument.arg,
+            unused.qualname,
+        )
+
+    @classmethod
+    def from_syntax_error(cls, path: str, error: SyntaxError) -> "Finding":
+        """Report a syntax error the way flake8 does."""
+        message = "E999 {}: {}".format(type(error).__name__, error.msg)
+        return cls(
+            path, error.lineno or 1, max((error.offset or 1) - 1, 0), "E999", "", "", message
+        )
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Finding":
+        """Read a finding written by JsonLinesWriter."""
+        path, line, code = record["path"], record["line"], record["code"]
+        # columns are written from 1
+        col = record["column"] - 1
+        if record["argument"] is None:
+            # only syntax errors aren't about an argument
+            return cls(path, line, col, code, "", "", record["message"])
+        return cls(path, line, col, code, record["argument"], record["function"] or "")
+
+    @property
+    def message(self) -> str:
+        if self.error:
+            return self.error
+        return "{} Unused argument '{}'".format(self.code, self.argument)
+
+    def as_lint_result(self) -> LintResult:
+        check = "syntax error" if self.error else "unused argument"
+        return (self.line, self.col, self.message, check)
+
+
+class UnusedArgument(NamedTuple):
+    function: FunctionTypes
+    argument: ast.arg
+    # where the function is defined
+    scope: Optional["Scope"]
+
+    @property
+    def qualname(self) -> str:
+        return join_qualname(self.scope, get_function_name(self.function))
+
+
+def make_lint_result(argument: ast.arg) -> LintResult:
+    name = argument.arg
+    line_number = argument.lineno
+    offset = argument.col_offset
+    error_code = get_error_code(name)
+
+    text = "{error_code} Unused argument '{name}'".format(
+        error_code=error_code, name=name
+    )
+    check = "unused argument"
+    return (line_number, offset, text, check)
+
+
+def get_error_code(name: str) -> str:
+    if name.startswith("_"):
+        return "U101"
+    else:
+        return "U100"
+
+
+def find_unused_arguments(
+    tree: ast.AST,
+    options: "Options",
+    changed_lines: Optional["LineRanges"] = None,
+    statistics: Optional["FileStatistics"] = None,
+    source: Optional[Union[str, bytes]] = None,
+) -> Iterator[UnusedArgument]:
+    """Find every function argument that should be reported, in order.
+
+    If changed_lines is given, only functions overlapping those lines are
+    checked. If statistics is given, what's done is counted and timed in it.
+    The symtable engine needs the source the tree was parsed from, and uses the
+    ast engine if it isn't given.
+    """
+    checked_arguments: Callable[[FunctionTypes, Optional[Scope]], List[Tuple[int, ast.arg]]]
+    checked_arguments = functools.partial(get_checked_arguments, options=options)
+    if statistics is not None:
+        checked_arguments = statistics.counting_ignored(checked_arguments, options)
+
+    tables = None
+    if options.engine == "symtable" and source is not None:
+        try:
+            tables = FunctionTables(source)
+        except SyntaxError:
+            # some errors are only found by the compiler, leave them to the ast engine
+            pass
+
+    if changed_lines is not None or tables is not None:
+        # check functions one at a time, either because only a few are wanted
+        # or because their symbol tables already say which names they use
+        finder: FunctionFinder
+        if tables is None:
+            finder = FunctionFinder(options.ignore_nested_functions)
+        else:
+            finder = LineFunctionFinder(tables.lines, options.ignore_nested_functions)
+        finder.visit(tree)
+        for function in finder.functions:
+            if changed_lines is not None and not changed_lines.overlaps(
+                *get_line_span(function)
+            ):
+                continue
+
+            get_unused: Callable[..., List[Tuple[int, ast.arg]]] = get_unused_arguments
+            table = None if tables is None else tables.get(function)
+            if tables is not None and table is not None:
+                get_unused = functools.partial(
+                    get_unused_arguments_from_table,
+                    table=table,
+                    class_name=tables.get_class_name(function),
+                )
+            if statistics is not None:
+                get_unused = statistics.timing_function(function, get_unused)
+            scope = finder.scopes[function]
+            unused = get_unused(function, checked_arguments(function, scope))
+            for _, argument in unused:
+                yield UnusedArgument(function, argument, scope)
+        return
+
+    if statistics is None:
+        analyzer = ScopeAnalyzer(options.ignore_nested_functions, checked_arguments)
+    else:
+        analyzer = ProfilingScopeAnalyzer(
+            statistics, options.ignore_nested_functions, checked_arguments
+        )
+    analyzer.visit(tree)
+
+    for function in analyzer.functions:
+        for _, argument in analyzer.unused_arguments[function]:
+            yield UnusedArgument(function, argument, analyzer.scopes[function])
+
+
+def get_checked_arguments(
+    function: FunctionTypes, scope: Optional["Scope"], options: "Options"
+) -> List[Tuple[int, ast.arg]]:
+    """Get the arguments of the given function, defined in scope, that should be
+    reported if unused."""
+    decorator_names = set(get_decorator_names(function))
+    if get_ignore_reason(function, scope, decorator_names, options) is not None:
+        return []
+
+    arguments = []
+    for i, argument in enumerate(get_arguments(function)):
+        name = argument.arg
+        if options.ignore_variadic_names:
+            if function.args.vararg and function.args.vararg.arg == name:
+                continue
+            if function.args.kwarg and function.args.kwarg.arg == name:
+                continue
+
+        # ignore self or whatever the first argument is for a classmethod
+        if i == 0 and (name == "self" or "classmethod" in decorator_names):
+            continue
+
+        arguments.append((i, argument))
+
+    return arguments
+
+
+def get_ignore_reason(
+    function: FunctionTypes,
+    scope: Optional["Scope"],
+    decorator_names: Set[str],
+    options: "Options",
+) -> Optional[str]:
+    """Get which option, if any, means the given function shouldn't be checked."""
+    # ignore overload functions, it's not a surprise when they're empty
+    if options.ignore_overload and "overload" in decorator_names:
+        return "overload"
+
+    # ignore overridden functions
+    if options.ignore_override and "override" in decorator_names:
+        return "override"
+    if options.overrides and (
+        join_qualname(scope, get_function_name(function)) in options.overrides
+    ):
+        return "override"
+
+    # ignore abstractmethods, it's not a surprise when they're empty
+    if options.ignore_abstract and "abstractmethod" in decorator_names:
+        return "abstract"
+
+    # ignore stub functions
+    if options.ignore_stubs and is_stub_function(function):
+        return "stub"
+
+    # ignore lambdas
+    if options.ignore_lambdas and isinstance(function, ast.Lambda):
+        return "lambda"
+
+    # ignore __double_underscore_methods__()
+    if options.ignore_dunder_methods and is_dunder_method(function):
+        return "dunder"
+
+    return None
+
+
+def get_unused_arguments(
+    function: FunctionTypes,
+    arguments: Optional[Iterable[Tuple[int, ast.arg]]] = None,
+) -> List[Tuple[int, ast.arg]]:
+    """Get all of the unused arguments in the given function, with their positions.
+
+    If arguments is given, only those (position, argument) pairs are checked.
+    """
+    if arguments is None:
+        arguments = enumerate(get_arguments(function))
+
+    unused = dict(arguments)
+    positions: Dict[str, List[int]] = {}
+    for i, argument in unused.items():
+        positions.setdefault(argument.arg, []).append(i)
+
+    # walk the function until every argument has been seen
+    nodes: List[ast.AST] = [function]
+    while positions and nodes:
+        node = nodes.pop()
+        if isinstance(node, ast.Name):
+            if not isinstance(node.ctx, Store):
+                for i in positions.pop(node.id, ()):
+                    del unused[i]
+        else:
+            add_child_nodes(node, nodes)
+
+    return list(unused.items())
+
+
+def add_child_nodes(node: ast.AST, nodes: List[ast.AST]) -> None:
+    """Append the child nodes of a node, like ast.iter_child_nodes() but without
+    a generator, which mypyc can't compile into a plain loop."""
+    for name in node._fields:
+        value = getattr(node, name, None)
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, ast.AST):
+                    nodes.append(item)
+        elif isinstance(value, ast.AST):
+            nodes.append(value)
+
+
+def get_unused_arguments_from_table(
+    function: FunctionTypes,
+    arguments: Iterable[Tuple[int, ast.arg]],
+    table: "symtable.SymbolTable",
+    class_name: Optional[str] = None,
+) -> List[Tuple[int, ast.arg]]:
+    """Get the unused arguments of the given function from its symbol table.
+
+    Unlike get_unused_arguments(), names are resolved the way Python does, so
+    an argument isn't used by a nested function with an argument of the same
+    name, or by a comprehension variable or global of that name. class_name
+    is the innermost class the function is in, which private names are
+    mangled with.
+    """
+    deleted: Optional[Set[str]] = None
+    unused = []
+    for i, argument in arguments:
+        name = get_symbol_name(argument.arg, class_name)
+        symbol = table.lookup(name)
+        if symbol.is_referenced() or is_used_by_children(table, name):
+            continue
+
+        # deleting an argument marks it as unused on purpose, which the symbol
+        # table can't tell apart from assigning to it
+        if symbol.is_assigned():
+            if deleted is None:
+                deleted = get_deleted_names(function)
+            if name in deleted:
+                continue
+
+        unused.append((i, argument))
+
+    return unused
+
+
+def get_symbol_name(argument: str, class_name: Optional[str]) -> str:
+    """Get the name the given argument has in the symbol table of a function in
+    the given class, mangled the way the compiler does, e.g. __x to _Class__x."""
+    if class_name is None or not argument.startswith("__") or argument.endswith("__"):
+        return argument
+    stripped = class_name.lstrip("_")
+    # classes named only with underscores don't mangle
+    return "_{}{}".format(stripped, argument) if stripped else argument
+
+
+def is_used_by_children(table: "symtable.SymbolTable", name: str) -> bool:
+    """Whether a scope nested in the given one uses its variable of the given name."""
+    for child in table.get_children():
+        try:
+            symbol = child.lookup(name)
+        except KeyError:
+            continue
+        # scopes in between get the name as a free variable too
+        if symbol.is_free() and (symbol.is_referenced() or is_used_by_children(child, name)):
+            return True
+
+    return False
+
+
+def get_deleted_names(function: FunctionTypes) -> Set[str]:
+    """Get the names deleted in the given function, not including nested functions."""
+    if isinstance(function, ast.Lambda):
+        return set()
+
+    deleted = set()
+    nodes: List[ast.AST] = list(function.body)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Del):
+                deleted.add(node.id)
+        # a del statement can't be in a lambda, so only these have their own scope
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            nodes.extend(ast.iter_child_nodes(node))
+
+    return deleted
+
+
+def get_arguments(function: FunctionTypes) -> List[ast.arg]:
+    """Get all of the argument names of the given function."""
+    args = function.args
+
+    ordered_arguments: List[ast.arg] = []
+
+    # plain old args
+    ordered_arguments.extend(args.args)
+
+    # *arg name
+    if args.vararg is not None:
+        ordered_arguments.append(args.vararg)
+
+    # *, key, word, only, args
+    ordered_arguments.extend(args.kwonlyargs)
+
+    # **kwarg name
+    if args.kwarg is not None:
+        ordered_arguments.append(args.kwarg)
+
+    return ordered_arguments
+
+
+def get_line_span(function: FunctionTypes) -> Tuple[int, int]:
+    """Get the first and last lines of the given function, including decorators."""
+    start = function.lineno
+    if not isinstance(function, ast.Lambda):
+        for decorator in function.decorator_list:
+            start = min(start, decorator.lineno)
+
+    end = getattr(function, "end_lineno", None) or start
+    return start, end
+
+
+def get_function_name(function: FunctionTypes) -> str:
+    if isinstance(function, ast.Lambda):
+        return "<lambda>"
+    return function.name
+
+
+def get_decorator_names(function: FunctionTypes) -> Iterable[str]:
+    if isinstance(function, ast.Lambda):
+        return
+
+    for decorator in function.decorator_list:
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+        if isinstance(decorator, ast.Name):
+            yield decorator.id
+        elif isinstance(decorator, ast.Attribute):
+            yield decorator.attr
+        # since Python 3.9, decorators can be any expression, e.g. buttons[0].connect
+        # is named connect, but buttons[0] has no name
+
+
+def is_stub_function(function: FunctionTypes) -> bool:
+    if isinstance(function, ast.Lambda):
+        return isinstance(function.body, ast.Ellipsis)
+
+    statement = function.body[0]
+    if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Str):
+        if len(function.body) > 1:
+            # first statement is a docstring, let's skip it
+            statement = function.body[1]
+        else:
+            # it's a function with only a docstring, that's a stub
+            return True
+
+    if isinstance(statement, ast.Pass):
+        return True
+    if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Ellipsis):
+        return True
+
+    if isinstance(statement, ast.Raise):
+        # raise NotImplementedError()
+        if (
+            isinstance(statement.exc, ast.Call)
+            and hasattr(statement.exc.func, "id")
+            and statement.exc.func.id == "NotImplementedError"
+        ):
+            return True
+
+        # raise NotImplementedError
+        elif (
+            isinstance(statement.exc, ast.Name)
+            and hasattr(statement.exc, "id")
+            and statement.exc.id == "NotImplementedError"
+        ):
+            return True
+
+    return False
+
+
+def is_dunder_method(function: FunctionTypes) -> bool:
+    if isinstance(function, ast.Lambda):
+        return False
+
+    if not hasattr(function, "name"):
+        return False
+
+    name = function.name
+    return len(name) > 4 and name.startswith("__") and name.endswith("__")
+
+
+class Scope(NamedTuple):
+    """A class or function, or the locals of one, linked to the scope it's in.
+
+    Every function only adds a link to the scope it's in, so finding the
+    functions of deeply nested code takes memory linear in its depth, and
+    qualnames are only joined for the functions that need one.
+    """
+
+    parent: Optional["Scope"]
+    name: str
+
+
+def join_qualname(scope: Optional[Scope], name: str) -> str:
+    """Get the __qualname__ of something with the given name defined in scope."""
+    names = [name]
+    while scope is not None:
+        names.append(scope.name)
+        scope = scope.parent
+    return ".".join(reversed(names))
+
+
+class QualnameVisitor(NodeVisitor):
+    """A visitor that knows the scope it's in, which __qualname__s are made from."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._scope: Optional[Scope] = None
+        # node type -> the method that visits it
+        self._visitors: Dict[type, Callable[[Any], Any]] = dict.fromkeys(
+            (ast.AsyncFunctionDef, ast.FunctionDef, ast.Lambda), self.visit_function_types
+        )
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        for name, value in ast.iter_fields(node):
+            if name == "body":
+                scope = self._scope
+                self._scope = Scope(scope, node.name)
+                self._visit_field(value)
+                self._scope = scope
+            else:
+                self._visit_field(value)
+
+    def visit(self, node: ast.AST) -> Any:
+        # like NodeVisitor.visit, but the method for each type of node is only
+        # looked up once. Functions go to visit_function_types without aliases
+        # like visit_FunctionDef = visit_function_types, which mypyc would
+        # compile into instance attributes
+        visitor = self._visitors.get(type(node))
+        if visitor is None:
+            name = "visit_" + type(node).__name__
+            visitor = self._visitors[type(node)] = getattr(self, name, self.generic_visit)
+        return visitor(node)
+
+    def visit_function_types(self, function: FunctionTypes) -> None:
+        self._visit_function_body(function)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # like NodeVisitor.generic_visit, but without ast.iter_fields(), a
+        # generator that mypyc can't compile into a plain loop
+        for name in node._fields:
+            value = getattr(node, name, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+
+    def _visit_function_body(self, function: FunctionTypes) -> None:
+        scope = self._scope
+        self._scope = Scope(Scope(scope, get_function_name(function)), "<locals>")
+        # not through _visit_field, as every frame counts towards the
+        # recursion limit for deeply nested functions
+        if isinstance(function, ast.Lambda):
+            self.visit(function.body)
+        else:
+            for statement in function.body:
+                self.visit(statement)
+        self._scope = scope
+
+    def _visit_field(self, value: object) -> None:
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, ast.AST):
+                    self.visit(item)
+        elif isinstance(value, ast.AST):
+            self.visit(value)
+
+
+class FunctionFinder(QualnameVisitor):
+    functions: List[FunctionTypes]
+    # where each function is defined
+    scopes: Dict[FunctionTypes, Optional[Scope]]
+
+    def __init__(self, only_top_level: bool = False) -> None:
+        super().__init__()
+        self.functions = []
+        self.scopes = {}
+        self.only_top_level = only_top_level
+
+    def visit_function_types(self, function: FunctionTypes) -> None:
+        self.functions.append(function)
+        self.scopes[function] = self._scope
+        if self.only_top_level:
+            return
+        self._visit_function_body(function)
+
+
+class LineFunctionFinder(FunctionFinder):
+    """A FunctionFinder that only looks inside nodes spanning one of the given lines.
+
+    Given the lines that functions start on, this finds the same functions
+    without walking most of the tree.
+    """
+
+    def __init__(self, lines: Sequence[int], only_top_level: bool = False) -> None:
+        super().__init__(only_top_level)
+        self.lines = lines
+
+    def visit(self, node: ast.AST) -> None:
+        start = getattr(node, "lineno", None)
+        end = getattr(node, "end_lineno", None)
+        if start is not None and end is not None:
+            # a decorated function starts after its decorators, but it has a
+            # line of its own, so anything in them is still found
+            i = bisect.bisect_left(self.lines, start)
+            if i == len(self.lines) or self.lines[i] > end:
+                return
+        super().visit(node)
+
+
+class ScopeAnalyzer(QualnameVisitor):
+    """Find every function and its unused arguments in a single traversal.
+
+    This gives the same results as running get_unused_arguments() over each
+    function found by FunctionFinder, but rather than re-walking a function for
+    every function that encloses it, it keeps the arguments of the enclosing
+    functions indexed by name and resolves each name as it is visited.
+    """
+
+    functions: List[FunctionTypes]
+    # where each function is defined
+    scopes: Dict[FunctionTypes, Optional[Scope]]
+    unused_arguments: Dict[FunctionTypes, List[Tuple[int, ast.arg]]]
+
+    def __init__(
+        self,
+        only_top_level: bool = False,
+        get_checked_arguments: Optional[
+            Callable[[FunctionTypes, Optional[Scope]], List[Tuple[int, ast.arg]]]
+        ] = None,
+    ) -> None:
+        super().__init__()
+        self.functions = []
+        self.scopes = {}
+        self.unused_arguments = {}
+        self.only_top_level = only_top_level
+        self.get_checked_arguments = get_checked_arguments or (
+            lambda function, _: list(enumerate(get_arguments(function)))  # noqa: U101
+        )
+        self._function_depth = 0
+        self._header_depth = 0
+        # argument name -> (unused arguments, index) for every enclosing function
+        # that hasn't used an argument of that name yet, innermost last
+        self._pending: Dict[str, List[Tuple[Dict[int, ast.arg], int]]] = {}
+
+    def visit_function_types(self, function: FunctionTypes) -> None:
+        # FunctionFinder only looks inside function bodies, so functions in
+        # decorators, defaults or annotations are never reported
+        reported = self._header_depth == 0 and not (
+            self.only_top_level and self._function_depth
+        )
+        if not reported and not self._pending:
+            # nothing in here can be reported or use an enclosing argument
+            return
+
+        arguments: List[Tuple[int, ast.arg]] = []
+        unused: Dict[int, ast.arg] = {}
+        if reported:
+            self.functions.append(function)
+            self.scopes[function] = self._scope
+            arguments = self.get_checked_arguments(function, self._scope)
+            unused.update(arguments)
+            for index, argument in arguments:
+                self._pending.setdefault(argument.arg, []).append((unused, index))
+
+            if not arguments and not self._pending and self.only_top_level:
+                # nothing in here can be reported or use an enclosing argument
+                self.unused_arguments[function] = []
+                return
+
+        for name, value in ast.iter_fields(function):
+            if name == "body":
+                self._function_depth += 1
+                self._visit_function_body(function)
+                self._function_depth -= 1
+            else:
+                self._header_depth += 1
+                self._visit_field(value)
+                self._header_depth -= 1
+
+        if reported:
+            for index, argument in reversed(arguments):
+                scopes = self._pending.get(argument.arg)
+                if scopes and scopes[-1][0] is unused:
+                    scopes.pop()
+                    if not scopes:
+                        del self._pending[argument.arg]
+            self.unused_arguments[function] = list(unused.items())
+
+    def visit_Name(self, name: ast.Name) -> None:
+        if isinstance(name.ctx, Store):
+            return
+
+        scopes = self._pending.pop(name.id, None)
+        if scopes is not None:
+            for unused, index in scopes:
+                del unused[index]
+
+
+class ProfilingScopeAnalyzer(ScopeAnalyzer):
+    """A ScopeAnalyzer that records what it does in a FileStatistics."""
+
+    def __init__(
+        self,
+        statistics: "FileStatistics",
+        only_top_level: bool = False,
+        get_checked_arguments: Optional[
+            Callable[[FunctionTypes, Optional[Scope]], List[Tuple[int, ast.arg]]]
+        ] = None,
+    ) -> None:
+        super().__init__(only_top_level, get_checked_arguments)
+        self.statistics = statistics
+
+    def visit(self, node: ast.AST) -> None:
+        self.statistics.nodes += 1
+        super().visit(node)
+
+    def visit_function_types(self, function: FunctionTypes) -> None:
+        if self._header_depth == 0 and self.only_top_level and self._function_depth:
+            self.statistics.skipped["nested"] = self.statistics.skipped.get("nested", 0) + 1
+
+        # the time for a function includes any functions nested inside it
+        visit = super().visit_function_types
+        if self._header_depth == 0 and not (self.only_top_level and self._function_depth):
+            visit = self.statistics.timing_function(function, visit)
+        visit(function)
+
+
+class FunctionTables:
+    """The symbol tables of every function in a module, found by name and line."""
+
+    def __init__(self, source: Union[str, bytes]) -> None:
+        import symtable
+
+        self._tables: Dict[Tuple[str, int], symtable.SymbolTable] = {}
+        # the innermost class each function is in, which private names are mangled with
+        self._class_names: Dict[Tuple[str, int], Optional[str]] = {}
+        # functions that can't be told apart by their name and line
+        self._ambiguous: Set[Tuple[str, int]] = set()
+
+        if isinstance(source, bytes):
+            source = decode_source(source)
+
+        lines = set()
+        tables: List[Tuple[symtable.SymbolTable, Optional[str]]] = [
+            (symtable.symtable(source, "<unknown>", "exec"), None)
+        ]
+        while tables:
+            table, class_name = tables.pop()
+            lines.add(table.get_lineno())
+            if table.get_type() == "function":
+                key = (table.get_name(), table.get_lineno())
+                if key in self._tables:
+                    self._ambiguous.add(key)
+                self._tables[key] = table
+                self._class_names[key] = class_name
+            elif table.get_type() == "class":
+                class_name = table.get_name()
+            tables.extend((child, class_name) for child in table.get_children())
+
+        # every line a function or class starts on
+        self.lines = sorted(lines)
+
+    def get(self, function: FunctionTypes) -> Optional["symtable.SymbolTable"]:
+        """Get the symbol table of the given function, if it can be found."""
+        name = "lambda" if isinstance(function, ast.Lambda) else function.name
+        key = (name, function.lineno)
+        if key in self._ambiguous:
+            return None
+        return self._tables.get(key)
+
+    def get_class_name(self, function: FunctionTypes) -> Optional[str]:
+        """Get the name of the innermost class the given function is in, if any."""
+        name = "lambda" if isinstance(function, ast.Lambda) else function.name
+        return self._class_names.get((name, function.lineno))
+
+
+@dataclass
+class FileStatistics:
+    """What was done to check a file, and how long it took."""
+
+    filename: str
+    seconds: float = 0.0
+    # AST nodes visited
+    nodes: int = 0
+    # functions found, whether they were checked or ignored
+    functions: int = 0
+    findings: int = 0
+    # functions not checked, by the option that ignored them
+    skipped: Dict[str, int] = field(default_factory=dict)
+    # (name, line, seconds) for each function checked
+    function_seconds: List[Tuple[str, int, float]] = field(default_factory=list)
+
+    def counting_ignored(
+        self,
+        get_checked_arguments: Callable[
+            [FunctionTypes, Optional[Scope]], List[Tuple[int, ast.arg]]
+        ],
+        options: Options,
+    ) -> Callable[[FunctionTypes, Optional[Scope]], List[Tuple[int, ast.arg]]]:
+        """Wrap get_checked_arguments to count the functions found and why any are ignored."""
+
+        def wrapper(function: FunctionTypes, scope: Optional[Scope]) -> List[Tuple[int, ast.arg]]:
+            self.functions += 1
+            decorator_names = set(get_decorator_names(function))
+            reason = get_ignore_reason(function, scope, decorator_names, options)
+            if reason is not None:
+                self.skipped[reason] = self.skipped.get(reason, 0) + 1
+            return get_checked_arguments(function, scope)
+
+        return wrapper
+
+    def timing_function(
+        self, function: FunctionTypes, f: Callable[..., _T]
+    ) -> Callable[..., _T]:
+        """Wrap f to record how long it takes as the time spent on function."""
+
+        def wrapper(*args: object) -> _T:
+            start = time.perf_counter()
+            try:
+                return f(*args)
+            finally:
+                self.function_seconds.append(
+                    (get_function_name(function), function.lineno, time.perf_counter() - start)
+                )
+
+        return wrapper
+
+    def write(self, filename: str) -> None:
+        """Append these statistics to the given file as a line of JSON."""
+        line = json.dumps(asdict(self)) + "\n"
+        # a single write, so concurrent processes don't interleave lines
+        with open(filename, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def profile(
+    tree: ast.AST,
+    options: Options,
+    filename: str = "<unknown>",
+    changed_lines: Optional["LineRanges"] = None,
+    source: Optional[Union[str, bytes]] = None,
+) -> Tuple[List[UnusedArgument], FileStatistics]:
+    """Find the unused arguments like find_unused_arguments(), recording statistics."""
+    statistics = FileStatistics(filename)
+    start = time.perf_counter()
+    unused_arguments = list(
+        find_unused_arguments(tree, options, changed_lines, statistics, source)
+    )
+    statistics.seconds = time.perf_counter() - start
+    statistics.findings = len(unused_arguments)
+    return unused_arguments, statistics
+
+
+def format_statistics(statistics: Iterable[FileStatistics], slowest: int) -> str:
+    """Summarise statistics for some files, including the slowest functions."""
+    files = 0
+    total = FileStatistics("")
+    functions: List[Tuple[float, str, int, str]] = []
+    for file_statistics in statistics:
+        files += 1
+        total.seconds += file_statistics.seconds
+        total.nodes += file_statistics.nodes
+        total.functions += file_statistics.functions
+        total.findings += file_statistics.findings
+        for reason, count in file_statistics.skipped.items():
+            total.skipped[reason] = total.skipped.get(reason, 0) + count
+        for name, line_number, seconds in file_statistics.function_seconds:
+            functions.append((seconds, file_statistics.filename, line_number, name))
+
+    lines = [
+        "{} files in {:.3f}s, {} nodes visited, {} functions found, {} findings".format(
+            files, total.seconds, total.nodes, total.functions, total.findings
+        )
+    ]
+    for reason, count in sorted(total.skipped.items()):
+        lines.append("skipped {} {} functions".format(count, reason))
+
+    functions.sort(key=lambda function: function[0], reverse=True)
+    if slowest and functions:
+        lines.append("slowest functions:")
+        for seconds, filename, line_number, name in functions[:slowest]:
+            lines.append(
+                "{:10.3f}ms  {}:{} {}".format(seconds * 1000, filename, line_number, name)
+            )
+
+    return "\n".join(lines)
+
+
+def get_file_options(
+    filename: str,
+    options: Options,
+    profiles: Optional[Profiles] = None,
+    overrides: Optional[Dict[str, Tuple[str, ...]]] = None,
+) -> Options:
+    """Get the options to check a file with, given its profiles and overrides."""
+    if profiles is not None:
+        options = profiles.get_options(filename, options)
+    if overrides is not None:
+        options = replace(options, overrides=overrides[filename])
+    return options
+
+
+def lint_source(
+    source: Union[str, bytes],
+    options: Optional[Options] = None,
+    filename: str = "<unknown>",
+    changed_lines: Optional["LineRanges"] = None,
+) -> List[LintResult]:
+    """Check the given source, reporting syntax errors the way flake8 does."""
+    findings = get_findings(source, options, filename, changed_lines)
+    return [finding.as_lint_result() for finding in findings]
+
+
+def get_findings(
+    source: Union[str, bytes],
+    options: Optional[Options] = None,
+    filename: str = "<unknown>",
+    changed_lines: Optional["LineRanges"] = None,
+    low_memory: bool = False,
+) -> List[Finding]:
+    """Check the given source like lint_source(), returning Findings in the same order.
+
+    If low_memory is set, the source is parsed and checked a chunk of top-level
+    statements at a time, with the same results.
+    """
+    if low_memory and isinstance(source, bytes):
+        try:
+            return get_findings_in_chunks(source, options, filename, changed_lines)
+        except (SyntaxError, UnicodeDecodeError, tokenize.TokenError):
+            # report it the same way as when the whole source is parsed
+            pass
+
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError as e:
+        return [Finding.from_syntax_error(filename, e)]
+
+    unused_arguments = find_unused_arguments(
+        tree, options or Options(), changed_lines, source=source
+    )
+    findings = [Finding.from_unused_argument(filename, unused) for unused in unused_arguments]
+    return sorted(findings, key=Finding.as_lint_result)
+
+
+def get_findings_in_chunks(
+    source: bytes,
+    options: Optional[Options] = None,
+    filename: str = "<unknown>",
+    changed_lines: Optional["LineRanges"] = None,
+) -> List[Finding]:
+    """Check the given source a chunk of top-level statements at a time.
+
+    Only one chunk's tree exists at once, so memory use depends on the
+    largest chunk rather than the whole source. Arguments can only be used
+    in the statement defining them, and every chunk after the first is
+    checked after the module's __future__ imports, so the findings are the same.
+    """
+    future_import = get_future_import(source)
+    findings = []
+    for start, chunk in iter_top_level_chunks(source):
+        if start > 1 and future_import:
+            findings.extend(
+                check_chunk(future_import + chunk, start - 2, options, filename, changed_lines)
+            )
+        else:
+            findings.extend(check_chunk(chunk, start - 1, options, filename, changed_lines))
+    return sorted(findings, key=Finding.as_lint_result)
+
+
+def check_chunk(
+    chunk: str,
+    offset: int,
+    options: Optional[Options],
+    filename: str,
+    changed_lines: Optional["LineRanges"],
+) -> List[Finding]:
+    """Check a chunk of source which starts offset lines into its file."""
+    tree = ast.parse(chunk, filename)
+    if changed_lines is not None:
+        changed_lines = changed_lines.shift(-offset)
+
+    findings = []
+    for unused in find_unused_arguments(tree, options or Options(), changed_lines, source=chunk):
+        finding = Finding.from_unused_argument(filename, unused)
+        findings.append(finding._replace(line=finding.line + offset))
+    return findings
+
+
+def iter_top_level_chunks(source: bytes, max_lines: int = 500) -> Iterator[Tuple[int, str]]:
+    """Split source into chunks of whole top-level statements, with the line each starts on.
+
+    Statements are put together until a chunk has at least max_lines lines, so
+    each chunk is either one statement or about max_lines long. Decorators stay
+    with what they decorate, and else, elif, except and finally with what they
+    continue.
+    """
+    lines: List[bytes] = []
+    readline = io.BytesIO(source).readline
+
+    def read() -> bytes:
+        line = readline()
+        lines.append(line)
+        return line
+
+    encoding = "utf-8"
+    start = 1
+    line_start = True
+    decorator = False
+    depth = 0
+    for token in tokenize.tokenize(read):
+        if token.type == tokenize.ENCODING:
+            encoding = token.string
+        elif token.type == tokenize.INDENT:
+            depth += 1
+        elif token.type == tokenize.DEDENT:
+            depth -= 1
+        elif token.type == tokenize.NEWLINE:
+            line_start = True
+        elif token.type in (tokenize.NL, tokenize.COMMENT):
+            pass
+        elif line_start:
+            line_start = False
+            if depth or token.string in ("else", "elif", "except", "finally"):
+                continue
+            if not decorator:
+                # the previous statement has ended, so end the chunk if it's big enough
+                line = token.start[0]
+                if line - start >= max_lines or token.type == tokenize.ENDMARKER:
+                    chunk = b"".join(lines[: line - start])
+                    if chunk:
+                        yield start, chunk.decode(encoding)
+                    del lines[: line - start]
+                    start = line
+            decorator = token.string == "@"
+
+    if any(lines):
+        yield start, b"".join(lines).decode(encoding)
+
+
+def get_future_import(source: Union[str, bytes]) -> str:
+    """Get a line importing the __future__ features source imports, or "" if none.
+
+    They change how the whole module compiles, e.g. annotations aren't
+    evaluated, so any part of it checked on its own is checked after this.
+    Only the start of the source is read, as they must come first.
+    """
+    if isinstance(source, bytes):
+        tokens = tokenize.tokenize(io.BytesIO(source).readline)
+    else:
+        tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+
+    features: List[str] = []
+    statement: List[str] = []
+    first = True
+    try:
+        for token in tokens:
+            if token.type in (tokenize.ENCODING, tokenize.NL, tokenize.COMMENT):
+                continue
+            if not (token.type in (tokenize.NEWLINE, tokenize.ENDMARKER) or token.string == ";"):
+                if not statement and not (
+                    token.string == "from" or (first and token.type == tokenize.STRING)
+                ):
+                    # anything but the docstring ends them
+                    break
+                statement.append(token.string)
+                continue
+            if statement[:3] == ["from", "__future__", "import"]:
+                names = [name for name in statement[3:] if name not in ("(", ")", ",")]
+                # the names after "as" aren't features
+                features.extend(
+                    name for i, name in enumerate(names) if name != "as" and names[i - 1] != "as"
+                )
+            elif statement and not all(string[-1:] in ("'", '"') for string in statement):
+                break
+            first = first and not statement
+            statement = []
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return "from __future__ import {}\n".format(", ".join(features)) if features else ""
+
+
+# a line of source and its line ending, which are only the ones Python counts
+SOURCE_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+")
+
+
+class LineRanges:
+    """A set of line numbers, stored as sorted, non-overlapping ranges."""
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Check if any line from start to end, inclusive, is in the set."""
+        i = bisect.bisect_left(self.ends, start)
+        return i < len(self.starts) and self.starts[i] <= end
+
+    def shift(self, offset: int) -> "LineRanges":
+        """Get the same ranges, with offset added to every line."""
+        return LineRanges((start + offset, end + offset) for start, end in zip(self.starts, self.ends))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LineRanges):
+            return NotImplemented
+        return (self.starts, self.ends) == (other.starts, other.ends)
+
+    def __repr__(self) -> str:
+        return "LineRanges({!r})".format(list(zip(self.starts, self.ends)))
+
+
+def decode_source(source: bytes) -> str:
+    """Decode source code, honouring its encoding declaration."""
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+    return source.decode(encoding)
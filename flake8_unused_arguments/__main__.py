@@ -0,0 +1,5 @@
+import sys
+
+from flake8_unused_arguments.cli import main
+
+sys.exit(main())
@@ -0,0 +1,164 @@
+import asyncio
+from collections import deque
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
+
+from flake8_unused_arguments import Finding, Options, iter_findings
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+def get_source_findings(
+    path: str, source: Union[str, bytes], options: Optional["Options"] = None
+) -> List["Finding"]:
+    """Check one source like iter_findings(), raising SyntaxError if it can't be parsed."""
+    return list(iter_findings([(path, source)], options))
+
+
+async def check_source(
+    source: Union[str, bytes],
+    options: Optional["Options"] = None,
+    path: str = "<unknown>",
+    executor: Optional["Executor"] = None,
+) -> List["Finding"]:
+    """Check a source in an executor, so the event loop isn't blocked while it's parsed.
+
+    executor defaults to the event loop's default, a thread pool, but parsing
+    holds the GIL throughout, so the event loop can still stall on large
+    sources unless a ProcessPoolExecutor is used instead. SyntaxError is
+    raised if the source can't be parsed. Cancelling stops waiting for the
+    check, though one that's already running in a thread finishes in the
+    background.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, get_source_findings, path, source, options)
+
+
+def check_many(
+    sources: Union[
+        Iterable[Tuple[str, Union[str, bytes]]], AsyncIterable[Tuple[str, Union[str, bytes]]]
+    ],
+    options: Optional["Options"] = None,
+    limit: int = 4,
+    executor: Optional["Executor"] = None,
+    timeout: Optional[float] = None,
+    on_syntax_error: Optional[Callable[[str, SyntaxError], None]] = None,
+    on_timeout: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator["Finding"]:
+    """Check (path, source) pairs with check_source(), up to limit at once,
+    yielding a Finding for each unused argument in the order of sources.
+
+    Sources, which may be an async iterable, are only read as checks finish,
+    so no more than limit are held at once, and none are read while the
+    caller isn't asking for findings. A source that takes longer than timeout
+    seconds is cancelled, raising asyncio.TimeoutError unless on_timeout is
+    given, in which case it's called with the path instead. Syntax errors are
+    handled like iter_findings(). Checks still running when the iteration
+    raises, is cancelled or is closed with aclose() are cancelled.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1, not {}".format(limit))
+
+    return ManyChecks(
+        sources, options or Options(), limit, executor, timeout, on_syntax_error, on_timeout
+    )
+
+
+class ManyChecks:
+    """The findings of check_many().
+
+    This is an async iterator rather than an async generator so that the
+    module can be compiled by mypyc, which doesn't support async generators.
+    """
+
+    def __init__(
+        self,
+        sources: Union[
+            Iterable[Tuple[str, Union[str, bytes]]], AsyncIterable[Tuple[str, Union[str, bytes]]]
+        ],
+        options: "Options",
+        limit: int,
+        executor: Optional["Executor"],
+        timeout: Optional[float],
+        on_syntax_error: Optional[Callable[[str, SyntaxError], None]],
+        on_timeout: Optional[Callable[[str], None]],
+    ) -> None:
+        self._async_sources: Optional[AsyncIterator[Tuple[str, Union[str, bytes]]]] = None
+        self._sources: Iterator[Tuple[str, Union[str, bytes]]] = iter(())
+        if isinstance(sources, AsyncIterable):
+            self._async_sources = sources.__aiter__()
+        else:
+            self._sources = iter(sources)
+        self.options = options
+        self.limit = limit
+        self.executor = executor
+        self.timeout = timeout
+        self.on_syntax_error = on_syntax_error
+        self.on_timeout = on_timeout
+        self._pending: Deque[Tuple[str, "asyncio.Task[List[Finding]]"]] = deque()
+        # the findings of the last check, still to be returned
+        self._findings: Deque[Finding] = deque()
+        self._exhausted = False
+
+    def __aiter__(self) -> "ManyChecks":
+        return self
+
+    async def __anext__(self) -> "Finding":
+        try:
+            while not self._findings:
+                await self._start_checks()
+                if not self._pending:
+                    raise StopAsyncIteration
+
+                path, task = self._pending.popleft()
+                try:
+                    self._findings.extend(await task)
+                except SyntaxError as e:
+                    if self.on_syntax_error is None:
+                        raise
+                    self.on_syntax_error(path, e)
+                except asyncio.TimeoutError:
+                    if self.on_timeout is None:
+                        raise
+                    self.on_timeout(path)
+        except BaseException:
+            self._cancel()
+            raise
+        return self._findings.popleft()
+
+    async def aclose(self) -> None:
+        self._exhausted = True
+        self._findings.clear()
+        self._cancel()
+
+    async def _start_checks(self) -> None:
+        while not self._exhausted and len(self._pending) < self.limit:
+            try:
+                if self._async_sources is not None:
+                    path, source = await self._async_sources.__anext__()
+                else:
+                    path, source = next(self._sources)
+            except (StopIteration, StopAsyncIteration):
+                self._exhausted = True
+                break
+            check = asyncio.wait_for(
+                check_source(source, self.options, path, self.executor), self.timeout
+            )
+            self._pending.append((path, asyncio.ensure_future(check)))
+
+    def _cancel(self) -> None:
+        while self._pending:
+            _, task = self._pending.popleft()
+            task.cancel()
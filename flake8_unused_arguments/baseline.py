@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple
+
+from flake8_unused_arguments import Finding
+
+
+class Baseline:
+    """Findings to stop reporting, such as those from before the check was enabled.
+
+    Findings are fingerprinted by their path, relative to the baseline file,
+    function and argument rather than their line, so they stay suppressed as
+    the code around them moves. Each fingerprint is counted, in case a
+    function has more than one lambda with the same argument, and looking one
+    up is a dict lookup however large the baseline is.
+    """
+
+    # bumped whenever the file format changes
+    format_version: ClassVar[int] = 1
+
+    def __init__(
+        self, root: str = ".", entries: Optional[Dict[str, Dict[Tuple[str, str], int]]] = None
+    ) -> None:
+        self.root = os.path.abspath(root)
+        # relative path -> (function, argument) -> number of findings
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, filename: str) -> "Baseline":
+        """Load a baseline saved by save(), raising ValueError if it's invalid."""
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        try:
+            if data["version"] != cls.format_version:
+                raise ValueError("unsupported version {!r}".format(data["version"]))
+            entries = {
+                path: {
+                    (function, argument): count
+                    for function, arguments in functions.items()
+                    for argument, count in arguments.items()
+                }
+                for path, functions in data["findings"].items()
+            }
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError("invalid baseline: {!r}".format(e))
+        return cls(os.path.dirname(os.path.abspath(filename)), entries)
+
+    def save(self, filename: str) -> None:
+        findings: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for path, counts in self.entries.items():
+            functions = findings[path] = {}
+            for (function, argument), count in counts.items():
+                functions.setdefault(function, {})[argument] = count
+        data = {"version": self.format_version, "findings": findings}
+
+        directory = os.path.dirname(filename) or "."
+        # write to a temporary file first so readers never see a partial baseline
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".baseline-tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # sorted and indented so it diffs well when committed
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(temporary, filename)
+
+    def relative_path(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def filter(self, findings: Iterable[Finding]) -> List[Finding]:
+        """Remove the findings that are in the baseline, keeping syntax errors."""
+        remaining: Dict[str, Dict[Tuple[str, str], int]] = {}
+        results = []
+        for finding in findings:
+            if finding.error:
+                results.append(finding)
+                continue
+
+            counts = remaining.get(finding.path)
+            if counts is None:
+                # copied, so that only as many findings as were recorded are removed
+                counts = remaining[finding.path] = dict(
+                    self.entries.get(self.relative_path(finding.path), {})
+                )
+            fingerprint = (finding.function, finding.argument)
+            if counts.get(fingerprint, 0) > 0:
+                counts[fingerprint] -= 1
+            else:
+                results.append(finding)
+        return results
+
+    def record(self, path: str, findings: Iterable[Finding]) -> None:
+        """Replace what's recorded for a file with its current findings."""
+        counts = get_fingerprint_counts(findings)
+        relative = self.relative_path(path)
+        if counts:
+            self.entries[relative] = counts
+        else:
+            self.entries.pop(relative, None)
+
+    def prune(self, path: str, findings: Iterable[Finding]) -> None:
+        """Remove what's recorded for a file but no longer found in it."""
+        relative = self.relative_path(path)
+        recorded = self.entries.get(relative)
+        if recorded is None:
+            return
+
+        counts = get_fingerprint_counts(findings)
+        pruned = {
+            fingerprint: min(count, counts[fingerprint])
+            for fingerprint, count in recorded.items()
+            if fingerprint in counts
+        }
+        if pruned:
+            self.entries[relative] = pruned
+        else:
+            del self.entries[relative]
+
+    def prune_missing(self) -> None:
+        """Remove what's recorded for files that no longer exist."""
+        for relative in list(self.entries):
+            if not os.path.isfile(os.path.join(self.root, relative)):
+                del self.entries[relative]
+
+    def __len__(self) -> int:
+        return sum(sum(counts.values()) for counts in self.entries.values())
+
+
+def get_fingerprint_counts(findings: Iterable[Finding]) -> Dict[Tuple[str, str], int]:
+    counts: Dict[Tuple[str, str], int] = {}
+    for finding in findings:
+        if not finding.error:
+            fingerprint = (finding.function, finding.argument)
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+    return counts
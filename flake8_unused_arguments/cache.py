@@ -0,0 +1,381 @@
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, ClassVar, Iterator, List, Optional, Sequence, Tuple, Union
+
+from flake8_unused_arguments import (
+    Finding,
+    Options,
+    Plugin,
+    SOURCE_LINE,
+    decode_source,
+    find_unused_arguments,
+    get_findings,
+    get_future_import,
+)
+
+
+# top-level statements, for watch mode and the daemon
+DEFAULT_STATEMENT_CACHE_SIZE = 65536
+
+
+class ResultCache:
+    """The findings of check_file() stored on disk, one file per result.
+
+    Results are keyed by a hash of the source and everything else that affects
+    them, so entries never need invalidating. The least recently used entries
+    are removed by prune() once the cache grows past its size limit.
+    """
+
+    # bumped whenever what's stored for each result changes
+    format_version: ClassVar[int] = 3
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def key(self, source: bytes, options: Options) -> str:
+        """Get the key for the given source, under the given options."""
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps(
+                [Plugin.version, sys.version, asdict(options), self.format_version],
+                sort_keys=True,
+            ).encode("utf-8")
+        )
+        digest.update(source)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Tuple[Any, ...]]]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                results = json.load(f)
+            # mark the entry as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return [tuple(result) for result in results]
+
+    def put(self, key: str, results: Sequence[Tuple[Any, ...]]) -> None:
+        try:
+            self.make_directory()
+
+            # write to a temporary file first so readers never see partial results
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(results, f)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            # caching is best effort
+            pass
+
+    def make_directory(self) -> None:
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, ".gitignore"), "w") as f:
+                f.write("# created by {}\n*\n".format(Plugin.name))
+
+    def prune(self, max_size: int) -> None:
+        """Remove the least recently used entries until the cache fits in max_size bytes."""
+        entries = []
+        total = 0
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        for path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _entries(self) -> Iterator[str]:
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith((".json", ".tmp")):
+                yield os.path.join(self.directory, name)
+
+
+class StatementCache:
+    """The findings of each top-level statement and method of the sources checked,
+    kept in memory.
+
+    get_findings() only parses and checks the statements whose text isn't
+    cached, so after an edit to a large file only the functions and methods
+    that changed are checked again, and the findings of the rest are moved to
+    their new lines. Entries are keyed by a hash of a statement's text and
+    the options, and the least recently used are forgotten once there are
+    more than max_size. It's safe to use from several threads.
+
+    Sources are split where a line starts in the first column, which outside
+    a string or brackets starts a statement, and top-level classes where a
+    line starts at the indentation of their methods. Methods are parsed after
+    a line declaring a class of the same name, so their qualnames, and the
+    names mangled in them, are the same, and every piece but the first after
+    the module's __future__ imports. Splitting anywhere else leaves the
+    text before the split unparsable, so it's joined to the text after, and
+    only text that was parsed on its own is cached.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_STATEMENT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        # statements found in the cache, and checked
+        self.hits = 0
+        self.misses = 0
+        # (hash of the text, options, whether it's one class) -> findings, less
+        # the path, on the lines of the text
+        self._findings: "OrderedDict[Tuple[bytes, Options, bool], List[Tuple[Any, ...]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get_findings(
+        self,
+        source: Union[str, bytes],
+        options: Optional[Options] = None,
+        filename: str = "<unknown>",
+    ) -> List[Finding]:
+        """Check the given source like get_findings(), with the same results."""
+        options = options or Options()
+        if isinstance(source, bytes):
+            try:
+                source = decode_source(source)
+            except (SyntaxError, UnicodeDecodeError):
+                return get_findings(source, options, filename)
+
+        lines = SOURCE_LINE.findall(source)
+        future_import = get_future_import(source)
+        results = self._check_lines(lines, 0, len(lines), None, future_import, options, filename)
+        if results is None:
+            # a syntax error, reported as when the whole source is parsed
+            return get_findings(source, options, filename)
+        findings = [Finding(filename, *result) for result in results]
+        return sorted(findings, key=Finding.as_lint_result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._findings.clear()
+
+    def __len__(self) -> int:
+        return len(self._findings)
+
+    def _check_lines(
+        self,
+        lines: Sequence[str],
+        start: int,
+        end: int,
+        class_name: Optional[str],
+        future_import: str,
+        options: Options,
+        filename: str,
+    ) -> Optional[List[Tuple[Any, ...]]]:
+        """Get the findings, less the path, of lines[start:end] a statement at a time,
+        or None if they aren't only whole statements.
+
+        If class_name is given, the lines are a class of that name, and its
+        body is split at its methods instead. Every piece but the one at the
+        start of the source is parsed after future_import, from get_future_import().
+        """
+        indent = ""
+        if class_name is not None:
+            method_indent = get_method_indent(lines, start, end)
+            if method_indent is None:
+                return self._check_piece(lines, start, end, "", future_import, options, filename)
+            indent = method_indent
+        starts = get_statement_starts(lines, start, end, indent) + [end]
+
+        results: List[Tuple[Any, ...]] = []
+        first = start
+        i = 0
+        while start < end:
+            while starts[i] <= start:
+                i += 1
+            while True:
+                piece_end = starts[i]
+                if class_name is None:
+                    found = None
+                    piece_class_name = get_class_name(lines, start, piece_end)
+                    if piece_class_name is not None:
+                        found = self._check_lines(
+                            lines,
+                            start,
+                            piece_end,
+                            piece_class_name,
+                            future_import,
+                            options,
+                            filename,
+                        )
+                    if found is None:
+                        # not a class, or not only one
+                        found = self._check_piece(
+                            lines, start, piece_end, "", future_import, options, filename
+                        )
+                else:
+                    # the first piece has the class statement's own line
+                    header = "" if start == first else "class {}:\n".format(class_name)
+                    found = self._check_piece(
+                        lines,
+                        start,
+                        piece_end,
+                        header,
+                        future_import,
+                        options,
+                        filename,
+                        in_class=True,
+                    )
+                if found is not None:
+                    break
+                if piece_end == end:
+                    return None
+                # join the text after, at least as much again so that a long
+                # string with lines in the first column is parsed few times
+                while starts[i] < end and starts[i] < piece_end + (piece_end - start):
+                    i += 1
+
+            results.extend(found)
+            start = piece_end
+        return results
+
+    def _check_piece(
+        self,
+        lines: Sequence[str],
+        start: int,
+        end: int,
+        header: str,
+        future_import: str,
+        options: Options,
+        filename: str,
+        in_class: bool = False,
+    ) -> Optional[List[Tuple[Any, ...]]]:
+        """Get the findings of lines[start:end] parsed after header, a line or nothing,
+        and future_import unless they start the source.
+
+        If in_class is set, they must be in one class with the header, which
+        they aren't if a split in a string or brackets joined two classes.
+        """
+        # the future import is part of the text, so it's part of the cache key too
+        header = (future_import if start else "") + header
+        found = self._check(header + "".join(lines[start:end]), options, filename, in_class)
+        if found is None:
+            return None
+        # line numbers start at 1, and after the lines before lines[start]
+        offset = start - header.count("\n")
+        return [(line + offset, *result) for line, *result in found]
+
+    def _check(
+        self, text: str, options: Options, filename: str, one_class: bool = False
+    ) -> Optional[List[Tuple[Any, ...]]]:
+        """Get the findings of whole statements, or None if text isn't only those,
+        or if one_class is set, only one class statement."""
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        key = (digest, options, one_class)
+        with self._lock:
+            results = self._findings.get(key)
+            if results is not None:
+                self._findings.move_to_end(key)
+                self.hits += 1
+                return results
+
+        try:
+            tree = ast.parse(text, filename)
+        except SyntaxError:
+            return None
+        if one_class and not (len(tree.body) == 1 and isinstance(tree.body[0], ast.ClassDef)):
+            return None
+        results = [
+            Finding.from_unused_argument(filename, unused)[1:]
+            for unused in find_unused_arguments(tree, options, source=text)
+        ]
+
+        with self._lock:
+            self.misses += 1
+            self._findings[key] = results
+            while len(self._findings) > self.max_size:
+                self._findings.popitem(last=False)
+        return results
+
+
+def get_statement_starts(
+    lines: Sequence[str], start: int = 0, end: Optional[int] = None, indent: str = ""
+) -> List[int]:
+    """Get the indexes of the lines from start to end, except the first, that may
+    start a function, a class, or any other statement after one at the given
+    indentation.
+
+    Other statements are left together, as there's less to cache in them than
+    it costs to parse them separately. Decorators stay with what they
+    decorate, and else, elif, except and finally with what they continue.
+    """
+    starts = []
+    definition = False
+    decorator = False
+    for i in range(start, len(lines) if end is None else end):
+        line = lines[i]
+        if not line.startswith(indent):
+            continue
+        line = line[len(indent):]
+        if not line or line[0] in " \t\f\r\n#)]}" or line.startswith(
+            ("else", "elif", "except", "finally")
+        ):
+            continue
+        was_definition = definition
+        definition = line.startswith(("def ", "async ", "class ", "@"))
+        if i > start and not decorator and (definition or was_definition):
+            starts.append(i)
+        decorator = line[0] == "@"
+    return starts
+
+
+# the start of a class statement, and its name
+CLASS_START = re.compile(r"class[ \t]+(\w+)[ \t]*[(:]")
+# a line starting a method, and its indentation
+METHOD_START = re.compile(r"([ \t]+)(?:@|def[ \t]|async[ \t]+def[ \t])")
+
+
+def get_class_name(lines: Sequence[str], start: int, end: int) -> Optional[str]:
+    """Get the name of the class that lines[start:end] start with, after any decorators."""
+    for i in range(start, end):
+        line = lines[i]
+        if not line or line[0] in " \t\f\r\n#)]}" or line[0] == "@":
+            continue
+        match = CLASS_START.match(line)
+        return None if match is None else match.group(1)
+    return None
+
+
+def get_method_indent(lines: Sequence[str], start: int, end: int) -> Optional[str]:
+    """Get the indentation of the first method in lines[start:end], a class."""
+    for i in range(start + 1, end):
+        match = METHOD_START.match(lines[i])
+        if match is not None:
+            return match.group(1)
+    return None
@@ -0,0 +1,331 @@
+import ast
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, Iterable, List, Optional, Set, Tuple
+
+from flake8_unused_arguments import QualnameVisitor, join_qualname
+from flake8_unused_arguments.files import check_files_with
+
+
+class ClassIndex:
+    """The classes of a project, with their bases and methods, for finding overrides.
+
+    Modules are indexed by path, and update() only re-parses files that have
+    changed since they were last indexed, so keeping the index of a large
+    project up to date is mostly a stat() per file. Bases are resolved through
+    each module's imports, including re-exports, but only to classes in the
+    index, so methods overriding those of other libraries aren't found.
+    """
+
+    # bumped whenever what's stored for each module changes
+    format_version: ClassVar[int] = 1
+
+    def __init__(self, modules: Optional[Dict[str, "IndexedModule"]] = None) -> None:
+        # path -> what's in the module
+        self.modules = modules or {}
+        self._by_name: Optional[Dict[str, IndexedModule]] = None
+
+    @classmethod
+    def load(cls, filename: str) -> "ClassIndex":
+        """Load an index saved by save(), or an empty one if it can't be read."""
+        try:
+            with open(filename, encoding="utf-8") as f:
+                data = json.load(f)
+            if data["version"] != cls.format_version:
+                return cls()
+            return cls(
+                {
+                    path: IndexedModule(
+                        module["name"],
+                        module["is_package"],
+                        tuple(module["stamp"]),
+                        module["imports"],
+                        {
+                            qualname: (bases, methods)
+                            for qualname, (bases, methods) in module["classes"].items()
+                        },
+                    )
+                    for path, module in data["modules"].items()
+                }
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+
+    def save(self, filename: str) -> None:
+        directory = os.path.dirname(filename) or "."
+        os.makedirs(directory, exist_ok=True)
+        data = {
+            "version": self.format_version,
+            # not asdict(), which is slow to copy a large index
+            "modules": {
+                path: {
+                    "name": module.name,
+                    "is_package": module.is_package,
+                    "stamp": module.stamp,
+                    "imports": module.imports,
+                    "classes": module.classes,
+                }
+                for path, module in self.modules.items()
+            },
+        }
+        # write to a temporary file first so readers never see a partial index
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".index-tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, filename)
+
+    def update(
+        self, filenames: Iterable[str], jobs: int = 1, executor: str = "process"
+    ) -> int:
+        """Index the given files if they've changed, and forget files that no longer exist.
+
+        Returns the number of files that were (re-)indexed.
+        """
+        stale = []
+        stamps = []
+        for filename in filenames:
+            path = os.path.abspath(filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            module = self.modules.get(path)
+            if module is None or module.stamp != stamp:
+                stale.append(path)
+                stamps.append(stamp)
+
+        for path in list(self.modules):
+            if not os.path.exists(path):
+                del self.modules[path]
+
+        indexed = check_files_with(index_file, stale, stamps, jobs=jobs, executor=executor)
+        for path, module in zip(stale, indexed):
+            self.modules[path] = module
+
+        self._by_name = None
+        return len(stale)
+
+    def get_overrides(self, filename: str, tree: Optional[ast.Module] = None) -> Tuple[str, ...]:
+        """Get the qualified names of the methods in a file that override a base class method.
+
+        If tree is given, the file's classes are taken from it rather than from
+        the index, in case the file has changed since it was indexed.
+        """
+        path = os.path.abspath(filename)
+        module: Optional[IndexedModule]
+        if tree is None:
+            module = self.modules.get(path)
+        else:
+            module = index_tree(tree, *get_module_name(path))
+        if module is None:
+            return ()
+
+        overrides: List[str] = []
+        for qualname, (bases, methods) in module.classes.items():
+            inherited = self._get_inherited_methods(bases, module)
+            overrides.extend(qualname + "." + method for method in methods if method in inherited)
+        return tuple(sorted(overrides))
+
+    def get_classes(self, filename: str) -> Optional[Tuple[Dict[str, str], Dict[str, Tuple[List[str], List[str]]]]]:
+        """Get the imports and classes indexed for a file, if it's in the index."""
+        module = self.modules.get(os.path.abspath(filename))
+        if module is None:
+            return None
+        return module.imports, module.classes
+
+    def _get_inherited_methods(self, bases: Iterable[str], local: "IndexedModule") -> Set[str]:
+        """Get the names of every method defined by the given bases or their ancestors."""
+        methods: Set[str] = set()
+        seen: Set[str] = set()
+        pending = list(bases)
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            found = self._find_class(name, local)
+            if found is not None:
+                methods.update(found[1])
+                pending.extend(found[0])
+
+        return methods
+
+    def _find_class(
+        self, name: str, local: "IndexedModule"
+    ) -> Optional[Tuple[List[str], List[str]]]:
+        """Find the class with the given full name, following imports of it."""
+        if self._by_name is None:
+            self._by_name = {module.name: module for module in self.modules.values()}
+
+        # e.g. a package importing a class from one of its modules
+        for _ in range(10):
+            parts = name.split(".")
+            for i in range(len(parts) - 1, 0, -1):
+                module_name = ".".join(parts[:i])
+                module = local if module_name == local.name else self._by_name.get(module_name)
+                if module is not None:
+                    break
+            else:
+                return None
+
+            qualname = ".".join(parts[i:])
+            if qualname in module.classes:
+                return module.classes[qualname]
+
+            target = module.imports.get(parts[i])
+            if target is None:
+                return None
+            name = ".".join([target] + parts[i + 1:])
+
+        return None
+
+
+@dataclass
+class IndexedModule:
+    """What a ClassIndex knows about a module."""
+
+    name: str
+    is_package: bool
+    # (mtime, size) of the file when it was indexed
+    stamp: Tuple[int, int] = (0, 0)
+    # names imported at the top level -> the full names they refer to
+    imports: Dict[str, str] = field(default_factory=dict)
+    # qualified name -> (full names of bases, names of methods) for every class
+    classes: Dict[str, Tuple[List[str], List[str]]] = field(default_factory=dict)
+
+
+class ClassFinder(QualnameVisitor):
+    """Find every class, resolving its bases to full names through the module's imports."""
+
+    classes: Dict[str, Tuple[List[str], List[str]]]
+
+    def __init__(self, module: str, imports: Dict[str, str]) -> None:
+        super().__init__()
+        self.classes = {}
+        self.module = module
+        self.imports = imports
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        bases = []
+        for base in node.bases:
+            name = get_dotted_name(base)
+            if name is None:
+                continue
+            first, _, rest = name.partition(".")
+            if first in self.imports:
+                bases.append(self.imports[first] + (rest and "." + rest))
+            else:
+                bases.append(self.module + "." + name)
+
+        methods = [
+            statement.name
+            for statement in node.body
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        self.classes[join_qualname(self._scope, node.name)] = (bases, methods)
+        super().visit_ClassDef(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # classes are only defined by statements, so there's no need to walk expressions
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, ast.expr):
+                self.visit(child)
+
+
+def index_file(filename: str, stamp: Tuple[int, int]) -> IndexedModule:
+    """Index the classes in a file, which has the given (mtime, size)."""
+    name, is_package = get_module_name(filename)
+    try:
+        with open(filename, "rb") as f:
+            tree = ast.parse(f.read(), filename)
+    except (OSError, SyntaxError, ValueError):
+        # there's nothing to index until it changes
+        return IndexedModule(name, is_package, stamp)
+
+    module = index_tree(tree, name, is_package)
+    module.stamp = stamp
+    return module
+
+
+def index_tree(tree: ast.Module, name: str, is_package: bool) -> IndexedModule:
+    imports = get_imports(tree, name, is_package)
+    finder = ClassFinder(name, imports)
+    finder.visit(tree)
+    return IndexedModule(name, is_package, imports=imports, classes=finder.classes)
+
+
+def get_module_name(filename: str) -> Tuple[str, bool]:
+    """Get the full name of the module in a file, and whether it's a package."""
+    directory, basename = os.path.split(os.path.abspath(filename))
+    name = os.path.splitext(basename)[0]
+    is_package = name == "__init__"
+    parts = [] if is_package else [name]
+    while os.path.exists(os.path.join(directory, "__init__.py")):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+
+    return ".".join(parts), is_package
+
+
+def get_imports(tree: ast.Module, module: str, is_package: bool) -> Dict[str, str]:
+    """Get the names imported at the top level of a module, including under if or try."""
+    imports = {}
+    statements: List[ast.AST] = list(tree.body)
+    for statement in statements:
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname is None:
+                    first = alias.name.partition(".")[0]
+                    imports[first] = first
+                else:
+                    imports[alias.asname] = alias.name
+        elif isinstance(statement, ast.ImportFrom):
+            # relative imports are from the package the module is in, or its parents
+            package = []
+            if statement.level:
+                package = module.split(".") if is_package else module.split(".")[:-1]
+                package = package[: len(package) - statement.level + 1]
+            imported = ".".join(package + ([statement.module] if statement.module else []))
+            for alias in statement.names:
+                if alias.name != "*":
+                    imports[alias.asname or alias.name] = imported + "." + alias.name
+        elif not isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            statements.extend(
+                child
+                for child in ast.iter_child_nodes(statement)
+                if isinstance(child, (ast.stmt, ast.excepthandler))
+            )
+
+    return imports
+
+
+def get_dotted_name(node: ast.expr) -> Optional[str]:
+    """Get the name a base class is referred to by, e.g. module.Base for module.Base[T]."""
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = get_dotted_name(node.value)
+        if value is not None:
+            return value + "." + node.attr
+    return None
+
+
+_class_indexes: Dict[str, Tuple[int, ClassIndex]] = {}
+
+
+def get_class_index(filename: str) -> ClassIndex:
+    """Load a saved ClassIndex, reusing it between calls until the file changes."""
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        return ClassIndex()
+
+    cached = _class_indexes.get(filename)
+    if cached is None or cached[0] != mtime:
+        cached = _class_indexes[filename] = (mtime, ClassIndex.load(filename))
+    return cached[1]
@@ -0,0 +1,536 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from flake8_unused_arguments import (
+    ENGINES,
+    ENGINE_HELP,
+    FileStatistics,
+    Finding,
+    OPTIONS,
+    Options,
+    PROFILES_HELP,
+    Plugin,
+    format_statistics,
+    get_profiles,
+)
+from flake8_unused_arguments.baseline import Baseline
+from flake8_unused_arguments.cache import ResultCache
+from flake8_unused_arguments.class_index import ClassIndex
+from flake8_unused_arguments.files import (
+    check_files,
+    check_sources,
+    default_executor,
+    find_changed_python_files,
+    find_python_files,
+    fix_files,
+)
+from flake8_unused_arguments.fix import FIXES, FIX_HELP
+from flake8_unused_arguments.formats import FORMATS
+from flake8_unused_arguments.git import (
+    GitObjectReader,
+    get_git_diff,
+    list_git_files,
+    parse_unified_diff,
+)
+from flake8_unused_arguments.shard import merge_findings, parse_shard, select_shard
+
+
+DEFAULT_EXCLUDE = ".svn,CVS,.bzr,.hg,.git,__pycache__,.tox,.nox,.eggs,*.egg"
+DEFAULT_CACHE_DIR = ".unused_arguments_cache"
+DEFAULT_CACHE_SIZE = 64
+# in the cache directory
+DEFAULT_CLASS_INDEX = "classes.index"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Check the given paths without going through flake8.
+
+    Output matches flake8's default format, and the exit status is 1 if
+    anything was reported.
+    """
+    parser = argparse.ArgumentParser(
+        prog=Plugin.name, description="Check Python files for unused arguments."
+    )
+    parser.add_argument("paths", nargs="*", default=["."], metavar="path")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes to check files with. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["process", "thread"],
+        default=default_executor(),
+        help=(
+            "Check files in parallel with processes or threads. Threads only help on "
+            "free-threaded builds of Python, where they are the default."
+        ),
+    )
+    parser.add_argument(
+        "--exclude",
+        default=DEFAULT_EXCLUDE,
+        help="Comma-separated list of file or directory patterns to skip.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory to cache results in. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write cached results.",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Remove all cached results before checking.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=(
+            "Maximum size of the cache in megabytes. The least recently used "
+            "results are removed past this. Defaults to %(default)s."
+        ),
+    )
+    parser.add_argument(
+        "--diff",
+        metavar="REVISIONS",
+        help=(
+            "Only check functions changed in the given git revision range, "
+            "e.g. origin/main...HEAD, or in a unified diff read from stdin if '-'."
+        ),
+    )
+    parser.add_argument(
+        "--git-rev",
+        metavar="REVISION",
+        help=(
+            "Check the files in a git commit or tree, read from the repository "
+            "rather than from disk."
+        ),
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check the files staged in git's index, rather than on disk.",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help=(
+            "Check the given files, or stdin if '-', with the daemon listening "
+            "on this socket instead of in this process."
+        ),
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a daemon listening on --socket rather than checking anything.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        default="default",
+        help=(
+            "How to write what's reported: flake8's default format, JSON Lines or "
+            "SARIF. Findings are written as each file is checked."
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        metavar="FILE",
+        help="Write what's reported to this file rather than stdout.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="INDEX/COUNT",
+        help=(
+            "Only check the files in one of COUNT shards, numbered from 1, for "
+            "splitting the check across machines. Files are assigned by a hash of "
+            "their path."
+        ),
+    )
+    parser.add_argument(
+        "--shard-by-size",
+        action="store_true",
+        help=(
+            "Assign files to shards so that each has about the same amount of "
+            "source, rather than by hash. Every shard must see the same files."
+        ),
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help=(
+            "Merge the given files of JSON Lines, e.g. from each --shard with "
+            "--format jsonl, into one sorted report without duplicates, rather "
+            "than checking anything."
+        ),
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help=(
+            "Don't report findings recorded in this file, matched by their file, "
+            "function and argument rather than their line."
+        ),
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help=(
+            "Record everything found in the checked files in the --baseline file, "
+            "replacing what was recorded for them, rather than reporting it."
+        ),
+    )
+    parser.add_argument(
+        "--prune-baseline",
+        action="store_true",
+        help=(
+            "Remove what's no longer found in the checked files, or in files that "
+            "no longer exist, from the --baseline file."
+        ),
+    )
+    parser.add_argument(
+        "--fix",
+        choices=FIXES,
+        help=FIX_HELP,
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help=(
+            "Parse and check each file a few top-level statements at a time, so "
+            "memory use depends on the size of the largest function or class "
+            "rather than the largest file."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running, checking files again as they change and printing "
+            "everything that's reported after each change."
+        ),
+    )
+    parser.add_argument(
+        "--class-index",
+        action="store_true",
+        help=(
+            "Ignore methods that override a method of a base class, found with an "
+            "index of the classes in the given paths. The index is kept in the cache "
+            "directory and only files that have changed are indexed again."
+        ),
+    )
+    parser.add_argument(
+        "--statistics",
+        metavar="FILE",
+        help="Write timings and counts for each file checked to this file as JSON lines.",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Print a summary of the run, with the N slowest functions, to stderr.",
+    )
+    for flag, dest, _, help_text in OPTIONS:
+        parser.add_argument(flag, action="store_true", dest=dest, help=help_text)
+    parser.add_argument(
+        "--unused-arguments-engine",
+        choices=ENGINES,
+        default="ast",
+        dest="unused_arguments_engine",
+        help=ENGINE_HELP,
+    )
+    parser.add_argument(
+        "--unused-arguments-profiles",
+        default="",
+        dest="unused_arguments_profiles",
+        help=PROFILES_HELP,
+    )
+
+    args = parser.parse_args(argv)
+    options = Options.from_namespace(args)
+    profiles = None
+    if args.unused_arguments_profiles:
+        try:
+            profiles = get_profiles(args.unused_arguments_profiles)
+        except (ValueError, re.error) as e:
+            parser.error("invalid --unused-arguments-profiles: {}".format(e))
+
+    if args.daemon:
+        if args.socket is None:
+            parser.error("--daemon requires --socket")
+        import signal
+
+        from flake8_unused_arguments.daemon import Daemon
+
+        # exit cleanly, removing the socket, when asked to stop
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            Daemon(args.socket, options, profiles=profiles).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.merge:
+        try:
+            findings = merge_findings(args.paths)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            parser.error("couldn't merge the findings: {!r}".format(e))
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            writer = FORMATS[args.format](output)
+            for finding in findings:
+                writer.write(finding)
+            writer.close()
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        return 1 if findings else 0
+
+    exclude = [pattern.strip() for pattern in args.exclude.split(",") if pattern.strip()]
+
+    if args.git_rev is None and not args.staged:
+        # paths in git are matched against the files there instead
+        for path in args.paths:
+            if path != "-" and not os.path.exists(path):
+                parser.error("no such file or directory: {}".format(path))
+
+    if args.socket is not None:
+        if args.format != "default" or args.output != "-":
+            parser.error("--format and --output can't be used with --watch or --socket")
+        from flake8_unused_arguments.daemon import run_client
+
+        return run_client(args.socket, list(find_python_files(args.paths, exclude)))
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir)
+        if args.clear_cache:
+            cache.clear()
+
+    from_git = args.git_rev is not None or args.staged
+    if from_git:
+        if args.git_rev is not None and args.staged:
+            parser.error("--git-rev can't be used with --staged")
+        # these read files from disk
+        if args.diff is not None or args.watch or args.class_index or args.shard_by_size:
+            parser.error(
+                "--git-rev and --staged can't be used with --diff, --watch, "
+                "--class-index or --shard-by-size"
+            )
+        if args.statistics or args.slowest or args.prune_baseline:
+            parser.error(
+                "--git-rev and --staged can't be used with --statistics, --slowest "
+                "or --prune-baseline"
+            )
+
+    changed = None
+    object_ids: Dict[str, str] = {}
+    if from_git:
+        try:
+            object_ids = dict(list_git_files(args.git_rev, args.paths, exclude))
+        except (OSError, subprocess.CalledProcessError) as e:
+            parser.error("couldn't list the files in git: {}".format(e))
+        filenames = list(object_ids)
+    elif args.diff is not None:
+        if args.diff == "-":
+            changed = parse_unified_diff(sys.stdin)
+        else:
+            try:
+                changed = parse_unified_diff(get_git_diff(args.diff))
+            except (OSError, subprocess.CalledProcessError) as e:
+                parser.error("couldn't get the diff for {}: {}".format(args.diff, e))
+        filenames = list(find_changed_python_files(changed, args.paths, exclude))
+    else:
+        filenames = list(find_python_files(args.paths, exclude))
+
+    if args.watch and (args.diff is not None or args.statistics or args.slowest):
+        parser.error("--watch can't be used with --diff, --statistics or --slowest")
+    if args.shard is not None:
+        if args.watch:
+            parser.error("--shard can't be used with --watch")
+        shard, shard_count = args.shard
+        filenames = select_shard(filenames, shard, shard_count, args.shard_by_size)
+    elif args.shard_by_size:
+        parser.error("--shard-by-size requires --shard")
+    if args.low_memory and (args.statistics or args.slowest):
+        parser.error("--low-memory can't be used with --statistics or --slowest")
+    if args.update_baseline or args.prune_baseline:
+        if args.baseline is None:
+            parser.error("--update-baseline and --prune-baseline require --baseline")
+        if args.update_baseline and args.prune_baseline:
+            parser.error("--update-baseline can't be used with --prune-baseline")
+        if args.watch or args.diff is not None:
+            # the findings of whole files are needed to know what's gone
+            parser.error(
+                "--update-baseline and --prune-baseline can't be used with --watch or --diff"
+            )
+    if args.fix is not None and (
+        args.watch
+        or from_git
+        or args.baseline is not None
+        or args.low_memory
+        or args.statistics
+        or args.slowest
+    ):
+        parser.error(
+            "--fix can't be used with --watch, --git-rev, --staged, --baseline, "
+            "--low-memory, --statistics or --slowest"
+        )
+    if args.watch and (args.format != "default" or args.output != "-"):
+        parser.error("--format and --output can't be used with --watch or --socket")
+
+    baseline = None
+    if args.baseline is not None:
+        if args.update_baseline and not os.path.exists(args.baseline):
+            baseline = Baseline(os.path.dirname(os.path.abspath(args.baseline)))
+        else:
+            try:
+                baseline = Baseline.load(args.baseline)
+            except (OSError, ValueError) as e:
+                parser.error("couldn't read the baseline {}: {}".format(args.baseline, e))
+
+    index = None
+    if args.class_index:
+        index_filename = os.path.join(args.cache_dir, DEFAULT_CLASS_INDEX)
+        if args.no_cache or args.clear_cache:
+            index = ClassIndex()
+        else:
+            index = ClassIndex.load(index_filename)
+        # the whole project, as bases may be in files that aren't being checked
+        index.update(find_python_files(args.paths, exclude), args.jobs, args.executor)
+        if cache is not None:
+            try:
+                cache.make_directory()
+                index.save(index_filename)
+            except OSError:
+                # like the cache, this is best effort
+                pass
+
+    if args.watch:
+        from flake8_unused_arguments.watch import watch
+
+        status = watch(
+            args.paths,
+            exclude,
+            filenames,
+            options,
+            args.jobs,
+            cache,
+            args.executor,
+            index,
+            low_memory=args.low_memory,
+            baseline=baseline,
+            profiles=profiles,
+        )
+        if cache is not None:
+            cache.prune(args.cache_size * 1024 * 1024)
+        return status
+
+    overrides = None
+    if index is not None:
+        overrides = {filename: index.get_overrides(filename) for filename in filenames}
+
+    count = 0
+    statistics: Optional[List[FileStatistics]] = None
+    if args.statistics or args.slowest:
+        statistics = []
+
+    fixed = 0
+
+    def fix_all(fix: str) -> Iterator[List[Finding]]:
+        nonlocal fixed
+        fixes = fix_files(
+            filenames, fix, options, args.jobs, changed, args.executor, overrides, profiles
+        )
+        for result in fixes:
+            fixed += result.fixed
+            yield result.skipped
+
+    reader = None
+    git_results = None
+    results_iter: Iterator[List[Finding]]
+    if args.fix is not None:
+        results_iter = fix_all(args.fix)
+    elif from_git:
+        reader = GitObjectReader()
+        sources = zip(filenames, reader.read_many(object_ids[f] for f in filenames))
+        results_iter = git_results = check_sources(
+            sources, options, args.jobs, cache, args.executor, args.low_memory, profiles=profiles
+        )
+    else:
+        results_iter = check_files(
+            filenames,
+            options,
+            args.jobs,
+            cache,
+            changed,
+            statistics,
+            args.executor,
+            overrides,
+            args.low_memory,
+            profiles,
+        )
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        writer = FORMATS[args.format](output)
+        for filename, results in zip(filenames, results_iter):
+            if baseline is not None:
+                if args.update_baseline:
+                    baseline.record(filename, results)
+                    continue
+                if args.prune_baseline:
+                    baseline.prune(filename, results)
+                results = baseline.filter(results)
+            for finding in results:
+                writer.write(finding)
+                count += 1
+        writer.close()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if git_results is not None:
+            # zip() stops at the last filename without resuming the checks, which
+            # would leave their workers running until they're shut down here
+            git_results.close()
+        if reader is not None:
+            reader.close()
+
+    if cache is not None:
+        cache.prune(args.cache_size * 1024 * 1024)
+
+    if args.fix is not None:
+        print("{} arguments fixed, {} not".format(fixed, count), file=sys.stderr)
+
+    if baseline is not None and (args.update_baseline or args.prune_baseline):
+        if args.prune_baseline:
+            baseline.prune_missing()
+        baseline.save(args.baseline)
+        print(
+            "{} findings recorded in {}".format(len(baseline), args.baseline), file=sys.stderr
+        )
+
+    if statistics is not None:
+        if args.statistics:
+            with open(args.statistics, "w", encoding="utf-8") as f:
+                for file_statistics in statistics:
+                    f.write(json.dumps(asdict(file_statistics)) + "\n")
+        if args.slowest:
+            print(format_statistics(statistics, args.slowest), file=sys.stderr)
+
+    return 1 if count else 0
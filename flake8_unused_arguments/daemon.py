@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flake8_unused_arguments import LintResult, Options, Profiles, decode_source, get_file_options
+from flake8_unused_arguments.cache import StatementCache
+
+
+DEFAULT_DAEMON_CACHE_SIZE = 1024
+
+
+def run_client(socket_path: str, filenames: Sequence[str]) -> int:
+    """Check the given files with a daemon, printing results like main() does."""
+    count = 0
+    with DaemonClient(socket_path) as client:
+        for filename in filenames:
+            display_name = "stdin" if filename == "-" else filename
+            for line_number, offset, text, _ in client.check(read_source(filename), display_name):
+                print("{}:{}:{}: {}".format(display_name, line_number, offset + 1, text))
+                count += 1
+
+    return 1 if count else 0
+
+
+class Daemon:
+    """A long-running server that checks sources sent over a Unix socket.
+
+    Each connection sends requests as lines of JSON, with the source to check
+    and optionally its filename, and gets a line of JSON back for each with
+    either the results or an error. Results are kept in memory by a hash of
+    the source, so checking an unchanged buffer again is a dictionary lookup,
+    and by the top-level statements in it, so after an edit only the
+    statements that changed are checked again.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        options: Optional[Options] = None,
+        cache_size: int = DEFAULT_DAEMON_CACHE_SIZE,
+        profiles: Optional[Profiles] = None,
+    ) -> None:
+        self.socket_path = socket_path
+        self.options = options or Options()
+        self.cache_size = cache_size
+        self.profiles = profiles
+        self._results: "OrderedDict[Tuple[str, Options], List[LintResult]]" = OrderedDict()
+        self._statements = StatementCache()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def serve_forever(self) -> None:
+        # bound under another name and moved into place once it's listening, so
+        # clients can connect as soon as the socket exists
+        bound_path = self.socket_path + ".new"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            if os.path.exists(bound_path):
+                os.remove(bound_path)
+            server.bind(bound_path)
+            server.listen()
+            self._running = True
+            # replaces a socket left behind by a daemon that didn't exit cleanly
+            os.replace(bound_path, self.socket_path)
+
+            try:
+                while self._running:
+                    connection, _ = server.accept()
+                    thread = threading.Thread(
+                        target=self._handle, args=(connection,), daemon=True
+                    )
+                    thread.start()
+            finally:
+                os.remove(self.socket_path)
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread."""
+        self._running = False
+        # wake up the accept() call
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(self.socket_path)
+
+    def check(self, source: str, filename: str = "<unknown>") -> List[LintResult]:
+        options = get_file_options(filename, self.options, self.profiles)
+        # the same source can be checked with different options by its filename
+        key = (hashlib.sha256(source.encode("utf-8", "surrogatepass")).hexdigest(), options)
+        with self._lock:
+            results = self._results.get(key)
+            if results is not None:
+                self._results.move_to_end(key)
+                return results
+
+        findings = self._statements.get_findings(source, options, filename)
+        results = [finding.as_lint_result() for finding in findings]
+
+        with self._lock:
+            self._results[key] = results
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+        return results
+
+    def _handle(self, connection: "socket.socket") -> None:
+        with connection, connection.makefile("rwb") as stream:
+            for line in stream:
+                try:
+                    request = json.loads(line)
+                    results = self.check(request["source"], request.get("filename", "<unknown>"))
+                    response: Dict[str, object] = {"results": results}
+                except Exception as e:
+                    response = {"error": "{}: {}".format(type(e).__name__, e)}
+
+                stream.write(json.dumps(response).encode("utf-8") + b"\n")
+                stream.flush()
+
+
+class DaemonClient:
+    """A connection to a Daemon, which can check any number of sources."""
+
+    def __init__(self, socket_path: str) -> None:
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(socket_path)
+        except OSError:
+            self._socket.close()
+            raise
+        self._stream = self._socket.makefile("rwb")
+
+    def check(self, source: str, filename: str = "<unknown>") -> List[LintResult]:
+        request = {"source": source, "filename": filename}
+        self._stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._stream.flush()
+
+        line = self._stream.readline()
+        if not line:
+            raise ConnectionError("the daemon closed the connection")
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+
+        return [(line, offset, text, check) for line, offset, text, check in response["results"]]
+
+    def close(self) -> None:
+        self._stream.close()
+        self._socket.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:  # noqa: U100
+        self.close()
+
+
+def read_source(filename: str) -> str:
+    """Read a file, or stdin if filename is '-', honouring its encoding declaration."""
+    if filename == "-":
+        source = sys.stdin.buffer.read()
+    else:
+        with open(filename, "rb") as f:
+            source = f.read()
+
+    return decode_source(source)
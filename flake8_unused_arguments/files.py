@@ -0,0 +1,339 @@
+import ast
+import fnmatch
+import functools
+import itertools
+import os
+import sys
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+    TypeVar,
+)
+
+from flake8_unused_arguments import (
+    FileStatistics,
+    Finding,
+    LineRanges,
+    Options,
+    Profiles,
+    get_file_options,
+    get_findings,
+    profile,
+)
+from flake8_unused_arguments.cache import ResultCache, StatementCache
+from flake8_unused_arguments.fix import FixResult, fix_file
+
+if TYPE_CHECKING:
+    import multiprocessing.context
+    from concurrent.futures import Executor
+
+
+_T = TypeVar("_T")
+
+
+def check_files(
+    filenames: Sequence[str],
+    options: Options,
+    jobs: int = 1,
+    cache: Optional["ResultCache"] = None,
+    changed: Optional[Dict[str, "LineRanges"]] = None,
+    statistics: Optional[List[FileStatistics]] = None,
+    executor: str = "process",
+    overrides: Optional[Dict[str, Tuple[str, ...]]] = None,
+    low_memory: bool = False,
+    profiles: Optional[Profiles] = None,
+) -> Iterator[List[Finding]]:
+    """Check each of the given files, in order, using up to jobs processes or threads.
+
+    If changed is given, only functions overlapping each file's changed lines
+    are checked. If statistics is given, statistics for each file are added to
+    it, and the cache isn't used so that they reflect the work of checking.
+    If overrides is given, it has the methods in each file that override a
+    base class method, from a ClassIndex. If low_memory is set, files are
+    checked a chunk at a time, see get_findings(). If profiles are given,
+    each file is checked with the options of the profiles it matches.
+    """
+    changed_lines = [None if changed is None else changed[f] for f in filenames]
+    file_options = [get_file_options(f, options, profiles, overrides) for f in filenames]
+
+    if statistics is not None:
+        profiled = check_files_with(
+            profile_file, filenames, changed_lines, file_options, jobs=jobs, executor=executor
+        )
+        for results, file_statistics in profiled:
+            statistics.append(file_statistics)
+            yield results
+        return
+
+    check = functools.partial(check_file, cache=cache, low_memory=low_memory)
+    yield from check_files_with(
+        check, filenames, changed_lines, file_options, jobs=jobs, executor=executor
+    )
+
+
+def fix_files(
+    filenames: Sequence[str],
+    fix: str,
+    options: Options,
+    jobs: int = 1,
+    changed: Optional[Dict[str, "LineRanges"]] = None,
+    executor: str = "process",
+    overrides: Optional[Dict[str, Tuple[str, ...]]] = None,
+    profiles: Optional[Profiles] = None,
+) -> Iterator["FixResult"]:
+    """Fix each of the given files with fix_file(), in order, like check_files()."""
+    changed_lines = [None if changed is None else changed[f] for f in filenames]
+    file_options = [get_file_options(f, options, profiles, overrides) for f in filenames]
+    yield from check_files_with(
+        fix_file,
+        filenames,
+        [fix] * len(filenames),
+        changed_lines,
+        file_options,
+        jobs=jobs,
+        executor=executor,
+    )
+
+
+def check_sources(
+    sources: Iterable[Tuple[str, bytes]],
+    options: Options,
+    jobs: int = 1,
+    cache: Optional["ResultCache"] = None,
+    executor: str = "process",
+    low_memory: bool = False,
+    batch_size: int = 1024,
+    profiles: Optional[Profiles] = None,
+) -> Generator[List[Finding], None, None]:
+    """Check each of the given (path, source) pairs, in order, like check_files().
+
+    Sources are read batch_size at a time, so that a long stream of them,
+    such as from iter_git_sources(), is never held in memory at once, and
+    every batch is checked by the same workers. Worker processes aren't
+    forked, as a stream's pipes, e.g. to git, would be copied into them and
+    never see their other end close.
+    """
+    check = functools.partial(check_file_source, cache=cache, low_memory=low_memory)
+    iterator = iter(sources)
+    pool: Optional["Executor"] = None
+    try:
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                return
+            filenames = [path for path, _ in batch]
+            arguments = (
+                [source for _, source in batch],
+                [None] * len(batch),
+                [get_file_options(f, options, profiles) for f in filenames],
+            )
+            # a first batch smaller than batch_size is every source there is
+            if pool is None and min(jobs, len(batch)) > 1:
+                pool = make_pool(min(jobs, len(batch)), executor, fork=False)
+            if pool is None:
+                yield from map(check, filenames, *arguments)
+            else:
+                chunksize = max(1, len(batch) // (jobs * 4))
+                yield from pool.map(check, filenames, *arguments, chunksize=chunksize)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def check_files_with(
+    check: Callable[..., _T],
+    filenames: Sequence[str],
+    *arguments: Sequence[object],
+    jobs: int,
+    executor: str = "process",
+    fork: bool = True,
+) -> Iterator[_T]:
+    """Call check on each file and its arguments, e.g. its changed lines, in order,
+    using up to jobs workers.
+
+    Nothing is shared between checks besides their arguments, so they're safe
+    to run in threads, including without the GIL. If fork is false, worker
+    processes are started without a copy of this one's open files.
+    """
+    jobs = min(jobs, len(filenames))
+    if jobs <= 1:
+        yield from map(check, filenames, *arguments)
+        return
+
+    with make_pool(jobs, executor, fork) as pool:
+        chunksize = max(1, len(filenames) // (jobs * 4))
+        yield from pool.map(check, filenames, *arguments, chunksize=chunksize)
+
+
+def make_pool(jobs: int, executor: str = "process", fork: bool = True) -> "Executor":
+    """Make a pool of jobs workers of the given kind, "process" or "thread"."""
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=jobs)
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=get_process_context(fork))
+
+
+def get_process_context(fork: bool) -> Optional["multiprocessing.context.BaseContext"]:
+    """Get how to start worker processes, the default unless they mustn't be forked."""
+    if fork:
+        return None
+    import multiprocessing
+
+    # the fork server is started fresh, with only the files it needs
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def default_executor() -> str:
+    """Use threads where they can run in parallel, i.e. without the GIL."""
+    is_gil_enabled: Callable[[], bool] = getattr(sys, "_is_gil_enabled", lambda: True)
+    return "process" if is_gil_enabled() else "thread"
+
+
+def check_file(
+    filename: str,
+    changed_lines: Optional["LineRanges"] = None,
+    options: Optional[Options] = None,
+    cache: Optional["ResultCache"] = None,
+    low_memory: bool = False,
+    statements: Optional["StatementCache"] = None,
+) -> List[Finding]:
+    """Check a single file, reporting syntax errors the way flake8 does.
+
+    If a cache is given, the file is only parsed if its results aren't cached.
+    Results for only the changed lines of a file aren't cached. If low_memory
+    is set, the file is checked a chunk at a time, see get_findings(). If
+    statements is given, only the statements whose results it doesn't have
+    are checked, unless only changed lines are.
+    """
+    with open(filename, "rb") as f:
+        source = f.read()
+    return check_file_source(
+        filename, source, changed_lines, options, cache, low_memory, statements
+    )
+
+
+def check_file_source(
+    filename: str,
+    source: bytes,
+    changed_lines: Optional["LineRanges"] = None,
+    options: Optional[Options] = None,
+    cache: Optional["ResultCache"] = None,
+    low_memory: bool = False,
+    statements: Optional["StatementCache"] = None,
+) -> List[Finding]:
+    """Check the source of a file like check_file(), e.g. as read from git."""
+    if changed_lines is not None:
+        cache = None
+
+    options = options or Options()
+
+    key = ""
+    if cache is not None:
+        key = cache.key(source, options)
+        cached = cache.get(key)
+        if cached is not None:
+            return [Finding(filename, *finding) for finding in cached]
+
+    if statements is not None and changed_lines is None:
+        results = statements.get_findings(source, options, filename)
+    else:
+        results = get_findings(source, options, filename, changed_lines, low_memory)
+
+    if cache is not None:
+        # without the path, as files with the same source share their results
+        cache.put(key, [finding[1:] for finding in results])
+
+    return results
+
+
+def profile_file(
+    filename: str,
+    changed_lines: Optional["LineRanges"] = None,
+    options: Optional[Options] = None,
+) -> Tuple[List[Finding], FileStatistics]:
+    """Check a single file like check_file(), recording statistics for it."""
+    with open(filename, "rb") as f:
+        source = f.read()
+
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError as e:
+        return [Finding.from_syntax_error(filename, e)], FileStatistics(filename)
+
+    unused_arguments, statistics = profile(
+        tree, options or Options(), filename, changed_lines, source
+    )
+    findings = [Finding.from_unused_argument(filename, unused) for unused in unused_arguments]
+    return sorted(findings, key=Finding.as_lint_result), statistics
+
+
+def find_python_files(paths: Iterable[str], exclude: Sequence[str]) -> Iterator[str]:
+    """Find the files to check, in a stable order.
+
+    Files given explicitly are always checked, and directories are searched
+    for .py files. Anything whose name or absolute path matches a pattern in
+    exclude is skipped.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        if is_excluded(path, exclude):
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not is_excluded(os.path.join(root, d), exclude))
+            for name in sorted(files):
+                filename = os.path.join(root, name)
+                if name.endswith(".py") and not is_excluded(filename, exclude):
+                    yield filename
+
+
+def is_excluded(path: str, exclude: Sequence[str]) -> bool:
+    """Whether the name or absolute path of a file or directory matches a pattern in exclude."""
+    name = os.path.basename(path)
+    absolute = os.path.abspath(path)
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(absolute, pattern)
+        for pattern in exclude
+    )
+
+
+def find_changed_python_files(
+    changed: Dict[str, "LineRanges"], paths: Iterable[str], exclude: Sequence[str]
+) -> Iterator[str]:
+    """Find the files in a diff to check, in a stable order.
+
+    Only existing .py files inside one of paths, and not matching exclude
+    the same way as find_python_files(), are checked.
+    """
+    roots = [os.path.abspath(path) for path in paths]
+
+    for filename in sorted(changed):
+        if not filename.endswith(".py") or not os.path.isfile(filename):
+            continue
+
+        absolute = os.path.abspath(filename)
+        if not any(
+            absolute == root or absolute.startswith(os.path.join(root, "")) for root in roots
+        ):
+            continue
+
+        parts = os.path.normpath(filename).split(os.sep)
+        if any(
+            fnmatch.fnmatch(part, pattern) for part in parts for pattern in exclude
+        ) or any(fnmatch.fnmatch(absolute, pattern) for pattern in exclude):
+            continue
+
+        yield filename
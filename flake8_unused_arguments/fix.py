@@ -0,0 +1,179 @@
+import ast
+import io
+import re
+import tokenize
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from flake8_unused_arguments import (
+    Finding,
+    FunctionTypes,
+    LineRanges,
+    Options,
+    SOURCE_LINE,
+    UnusedArgument,
+    find_unused_arguments,
+)
+
+
+FIXES = ["prefix", "del"]
+FIX_HELP = (
+    "Fix what's reported: 'prefix' adds an underscore to each unused argument's "
+    "name, except arguments that callers may pass by name, and 'del' "
+    "deletes them at the start of the function, which callers can't see. Anything "
+    "that can't be fixed safely is reported."
+)
+
+
+class FixResult(NamedTuple):
+    fixed: int
+    # what was found but not fixed, as it couldn't be done safely
+    skipped: List[Finding]
+
+
+def fix_file(
+    filename: str,
+    fix: str,
+    changed_lines: Optional["LineRanges"] = None,
+    options: Optional[Options] = None,
+) -> FixResult:
+    """Fix the unused arguments of a file in place with fix_source(), rewriting it once."""
+    with open(filename, "rb") as f:
+        source = f.read()
+
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError as e:
+        return FixResult(0, [Finding.from_syntax_error(filename, e)])
+
+    unused = list(find_unused_arguments(tree, options or Options(), changed_lines, source=source))
+    fixed_source, skipped = fix_source(source, unused, fix)
+    if fixed_source != source:
+        # in place, to keep the file's permissions
+        with open(filename, "wb") as f:
+            f.write(fixed_source)
+
+    findings = [Finding.from_unused_argument(filename, argument) for argument in skipped]
+    return FixResult(len(unused) - len(skipped), sorted(findings, key=Finding.as_lint_result))
+
+
+def fix_source(
+    source: bytes, unused: Sequence[UnusedArgument], fix: str
+) -> Tuple[bytes, List[UnusedArgument]]:
+    """Fix the given unused arguments of a source, returning it with those that were skipped.
+
+    Every edit is worked out from the positions in the tree the arguments
+    were found in, then applied at once from the end of the source back, so
+    nothing is parsed again.
+    """
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+    # split the way Python does, rather than on every character str.splitlines() does
+    lines = SOURCE_LINE.findall(source.decode(encoding))
+
+    # (line index, column, text to insert there)
+    edits: List[Tuple[int, int, str]] = []
+    skipped = []
+    if fix == "prefix":
+        names: Dict[int, Set[str]] = {}
+        for unused_argument in unused:
+            function, argument = unused_argument.function, unused_argument.argument
+            if id(function) not in names:
+                names[id(function)] = get_names(function)
+            new_name = "_" + argument.arg
+            # callers may pass anything but positional-only and variadic arguments by name
+            if (
+                argument.arg.startswith("_")
+                or argument in function.args.args
+                or argument in function.args.kwonlyargs
+                or new_name in names[id(function)]
+            ):
+                skipped.append(unused_argument)
+                continue
+            line = argument.lineno - 1
+            edits.append((line, get_text_column(lines[line], argument.col_offset), "_"))
+    elif fix == "del":
+        by_function: Dict[int, List[UnusedArgument]] = {}
+        for unused_argument in unused:
+            by_function.setdefault(id(unused_argument.function), []).append(unused_argument)
+        for arguments in by_function.values():
+            function = arguments[0].function
+            # super() without arguments reads the first argument, and __class__
+            # is only set for methods that may call it so
+            if {"super", "__class__"} & get_names(function):
+                skipped.extend(arguments)
+                continue
+            edit = get_del_edit(function, [a.argument.arg for a in arguments], lines)
+            if edit is None:
+                skipped.extend(arguments)
+            else:
+                edits.append(edit)
+    else:
+        raise ValueError("unknown fix {!r}".format(fix))
+
+    for line, column, text in sorted(edits, reverse=True):
+        if line == len(lines):
+            lines.append(text)
+        else:
+            lines[line] = lines[line][:column] + text + lines[line][column:]
+    return "".join(lines).encode(encoding), skipped
+
+
+def get_del_edit(
+    function: FunctionTypes, names: Sequence[str], lines: Sequence[str]
+) -> Optional[Tuple[int, int, str]]:
+    """Get the edit deleting names at the start of a function, after its docstring,
+    or None if the function has no line of its own to put it on.
+    """
+    if isinstance(function, ast.Lambda):
+        return None
+
+    statement: Optional[ast.stmt] = function.body[0]
+    docstring = None
+    if (
+        isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Constant)
+        and isinstance(statement.value.value, str)
+    ):
+        docstring = statement
+        statement = function.body[1] if len(function.body) > 1 else None
+
+    # the statement the del goes before, or the docstring it goes after, must
+    # start its line, rather than following the def or a semicolon
+    anchor = statement or docstring
+    assert anchor is not None
+    decorators = getattr(anchor, "decorator_list", [])
+    start = min([anchor.lineno] + [decorator.lineno for decorator in decorators])
+    line = lines[start - 1]
+    indent = line[: len(line) - len(line.lstrip(" \t\f"))]
+    if decorators:
+        if not line.startswith("@", len(indent)):
+            return None
+    elif get_text_column(line, anchor.col_offset) != len(indent):
+        return None
+
+    newline = re.search(r"\r\n|\r|\n", line)
+    deletion = "{}del {}".format(indent, ", ".join(names))
+    if statement is not None:
+        return (start - 1, 0, deletion + (newline.group() if newline else "\n"))
+
+    assert docstring is not None and docstring.end_lineno is not None
+    end = lines[docstring.end_lineno - 1]
+    if end.endswith(("\n", "\r")):
+        return (docstring.end_lineno, 0, deletion + (newline.group() if newline else "\n"))
+    # the docstring ends the file
+    return (docstring.end_lineno - 1, len(end), "\n" + deletion + "\n")
+
+
+def get_text_column(line: str, col_offset: int) -> int:
+    """Convert a column in UTF-8 bytes, as the ast module gives them, to characters."""
+    return len(line.encode("utf-8")[:col_offset].decode("utf-8", "ignore"))
+
+
+def get_names(function: FunctionTypes) -> Set[str]:
+    """Get every name used or defined anywhere in a function, including its arguments."""
+    names = set()
+    for node in ast.walk(function):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+    return names
@@ -0,0 +1,126 @@
+import json
+import os
+import pathlib
+import urllib.parse
+from typing import Callable, ClassVar, Dict, List, TextIO, Tuple
+
+from flake8_unused_arguments import Finding, Plugin
+
+
+class FindingWriter:
+    """Writes findings to a stream as they're found, so nothing is buffered."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def write(self, finding: Finding) -> None:  # noqa: U100
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finish writing, without closing the stream."""
+        self.stream.flush()
+
+
+class TextWriter(FindingWriter):
+    """Writes findings in flake8's default format."""
+
+    def write(self, finding: Finding) -> None:
+        self.stream.write(
+            "{}:{}:{}: {}\n".format(finding.path, finding.line, finding.col + 1, finding.message)
+        )
+
+
+class JsonLinesWriter(FindingWriter):
+    """Writes each finding as a line of JSON."""
+
+    def write(self, finding: Finding) -> None:
+        record = {
+            "path": finding.path,
+            "line": finding.line,
+            # from 1, like flake8's output
+            "column": finding.col + 1,
+            "code": finding.code,
+            "message": finding.message,
+            "argument": finding.argument or None,
+            "function": finding.function or None,
+        }
+        self.stream.write(json.dumps(record) + "\n")
+
+
+class SarifWriter(FindingWriter):
+    """Writes findings as a SARIF 2.1.0 log, with a result for each finding."""
+
+    RULES: ClassVar[List[Tuple[str, str]]] = [
+        ("U100", "Unused argument"),
+        ("U101", "Unused argument starting with an underscore"),
+        ("E999", "Syntax error"),
+    ]
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        log = {
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": Plugin.name,
+                            "version": Plugin.version,
+                            "informationUri": "https://github.com/nhoad/flake8-unused-arguments",
+                            "rules": [
+                                {"id": code, "shortDescription": {"text": description}}
+                                for code, description in self.RULES
+                            ],
+                        }
+                    },
+                    "results": [],
+                }
+            ],
+        }
+        # write everything around the results now, and the results as they come
+        self._start, self._end = json.dumps(log).split('"results": []')
+        self.stream.write(self._start + '"results": [')
+        self._separator = ""
+
+    def write(self, finding: Finding) -> None:
+        result = {
+            "ruleId": finding.code,
+            "level": "error" if finding.error else "warning",
+            "message": {"text": finding.message},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": get_uri(finding.path)},
+                        "region": {"startLine": finding.line, "startColumn": finding.col + 1},
+                    },
+                    "logicalLocations": [
+                        {"fullyQualifiedName": finding.function, "kind": "function"}
+                    ]
+                    if finding.function
+                    else [],
+                }
+            ],
+        }
+        if finding.argument:
+            result["properties"] = {"argument": finding.argument}
+        self.stream.write(self._separator + json.dumps(result))
+        self._separator = ","
+
+    def close(self) -> None:
+        self.stream.write("]" + self._end + "\n")
+        super().close()
+
+
+FORMATS: Dict[str, Callable[[TextIO], FindingWriter]] = {
+    "default": TextWriter,
+    "jsonl": JsonLinesWriter,
+    "sarif": SarifWriter,
+}
+
+
+def get_uri(path: str) -> str:
+    """Get the URI of a file, relative if its path is."""
+    if os.path.isabs(path):
+        return pathlib.Path(path).as_uri()
+    return urllib.parse.quote(pathlib.PurePath(os.path.normpath(path)).as_posix())
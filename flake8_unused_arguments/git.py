@@ -0,0 +1,202 @@
+import os
+import re
+import subprocess
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from flake8_unused_arguments import LineRanges
+from flake8_unused_arguments.files import is_excluded
+
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def parse_unified_diff(lines: Iterable[str]) -> Dict[str, LineRanges]:
+    """Get the changed lines of each file in a unified diff, numbered as in the new file.
+
+    Removed lines are treated as changing the lines either side of them, and
+    deleted files are left out.
+    """
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    current: Optional[List[Tuple[int, int]]] = None
+
+    for line in lines:
+        if line.startswith("+++ "):
+            path = line[4:].rstrip("\r\n").split("\t")[0]
+            if path == "/dev/null":
+                current = None
+                continue
+            if path.startswith("b/"):
+                path = path[2:]
+            current = ranges.setdefault(path, [])
+            continue
+
+        match = HUNK_HEADER.match(line)
+        if match is None or current is None:
+            continue
+
+        start = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        if count:
+            current.append((start, start + count - 1))
+        else:
+            current.append((max(start, 1), start + 1))
+
+    return {path: LineRanges(changed) for path, changed in ranges.items()}
+
+
+def get_git_diff(revisions: str) -> List[str]:
+    """Get the diff for a git revision range, with paths relative to the current directory."""
+    output = subprocess.run(
+        ["git", "diff", "-U0", "--no-color", "--no-ext-diff", "--relative", revisions, "--"],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return output.splitlines()
+
+
+def list_git_files(
+    revision: Optional[str], paths: Sequence[str], exclude: Sequence[str]
+) -> List[Tuple[str, str]]:
+    """List the .py files in a git tree-ish, or in the index if revision is None,
+    with their object ids.
+
+    Like find_python_files(), only files inside one of paths, and without a
+    directory or name matching exclude, are listed. Paths are relative to
+    the current directory.
+    """
+    if revision is None:
+        command = ["git", "ls-files", "--stage", "-z", "--"]
+    else:
+        command = ["git", "ls-tree", "-r", "-z", revision, "--"]
+    output = subprocess.run(
+        command + list(paths), check=True, stdout=subprocess.PIPE
+    ).stdout
+
+    files = []
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        info, _, path = entry.partition(b"\t")
+        # ls-files gives the mode, object and stage, and ls-tree the mode, type and object
+        fields = info.split()
+        if revision is None:
+            object_id = fields[1]
+            if fields[2] != b"0":
+                # not yet merged, so there's no one version to check
+                continue
+        else:
+            object_id = fields[2]
+        # only regular files, rather than symlinks or submodules
+        if fields[0] not in (b"100644", b"100755"):
+            continue
+
+        filename = os.fsdecode(path)
+        if filename.endswith(".py") and not is_excluded_git_path(filename, exclude):
+            files.append((filename, object_id.decode("ascii")))
+    return files
+
+
+def is_excluded_git_path(path: str, exclude: Sequence[str]) -> bool:
+    """Whether a file or any of its directories matches a pattern in exclude."""
+    parts = path.split("/")
+    return any(
+        is_excluded(os.path.join(*parts[: i + 1]), exclude) for i in range(len(parts))
+    )
+
+
+def iter_git_sources(
+    revision: Optional[str], paths: Sequence[str] = (".",), exclude: Sequence[str] = ()
+) -> Iterator[Tuple[str, bytes]]:
+    """Read the .py files in a git tree-ish, or in the index if revision is None,
+    as (path, source) pairs for iter_findings() or check_sources().
+
+    All of the files are read through a single git cat-file process.
+    """
+    files = list_git_files(revision, paths, exclude)
+    with GitObjectReader() as reader:
+        sources = reader.read_many(object_id for _, object_id in files)
+        for (path, _), source in zip(files, sources):
+            yield path, source
+
+
+class GitObjectReader:
+    """Reads objects from the git repository in the current directory with one
+    long-running git cat-file --batch, rather than a process per object.
+    """
+
+    def __init__(self) -> None:
+        self.process = self._start()
+
+    def read(self, object_id: str) -> bytes:
+        """Read an object, raising KeyError if it doesn't exist."""
+        return next(self.read_many([object_id]))
+
+    def read_many(self, object_ids: Iterable[str]) -> Iterator[bytes]:
+        """Read objects in order, raising KeyError for any that doesn't exist.
+
+        Requests are written from another thread while objects are read, so
+        git never waits for the next request.
+        """
+        stdin, stdout = self.process.stdin, self.process.stdout
+        assert stdin is not None and stdout is not None
+
+        def request() -> None:
+            try:
+                for object_id in object_ids:
+                    stdin.write(object_id.encode("ascii") + b"\n")
+                stdin.flush()
+            except OSError:
+                # the reader stopped early and killed the process
+                pass
+
+        count = 0
+        object_ids = list(object_ids)
+        thread = threading.Thread(target=request, daemon=True)
+        thread.start()
+        try:
+            for object_id in object_ids:
+                header = stdout.readline().split()
+                if len(header) != 3:
+                    raise KeyError(object_id)
+                size = int(header[2])
+                data = stdout.read(size)
+                # each object is followed by a newline
+                stdout.read(1)
+                count += 1
+                yield data
+        finally:
+            if count < len(object_ids):
+                # the rest of the responses can't be skipped, so start again,
+                # killing the process first so that requests stop blocking
+                self.process.kill()
+                thread.join()
+                self.close()
+                self.process = self._start()
+            else:
+                thread.join()
+
+    def close(self) -> None:
+        # stdout first, so that git stops, rather than blocking requests still
+        # being written
+        if self.process.stdout is not None:
+            self.process.stdout.close()
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                # requests that were never read
+                pass
+        self.process.wait()
+
+    def __enter__(self) -> "GitObjectReader":
+        return self
+
+    def _start(self) -> "subprocess.Popen[bytes]":
+        return subprocess.Popen(
+            ["git", "cat-file", "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+
+    def __exit__(self, *exc_info: object) -> None:  # noqa: U100
+        self.close()
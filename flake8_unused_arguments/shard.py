@@ -0,0 +1,74 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+from typing import Iterable, List, Sequence, Tuple
+
+from flake8_unused_arguments import Finding
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard given as INDEX/COUNT, numbered from 1."""
+    index, _, count = value.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected INDEX/COUNT, e.g. 1/4, not {!r}".format(value))
+    if not 1 <= shard[0] <= shard[1]:
+        raise argparse.ArgumentTypeError("INDEX must be from 1 to COUNT, not {!r}".format(value))
+    return shard
+
+
+def select_shard(
+    filenames: Sequence[str], index: int, count: int, by_size: bool = False
+) -> List[str]:
+    """Select the files in one of count shards, numbered from 1, keeping their order.
+
+    Files are assigned by a hash of their path, so each shard can select its
+    files without the others, and files stay in the same shard as files are
+    added or removed. With by_size, the largest files are assigned first,
+    each to the shard with the least source so far, so that shards take about
+    as long as each other, as long as they all see the same files.
+    """
+    if by_size:
+        sizes = {}
+        for filename in filenames:
+            try:
+                sizes[filename] = os.path.getsize(filename)
+            except OSError:
+                sizes[filename] = 0
+
+        # the total size of each shard, and the shard, smallest first
+        totals = [(0, shard) for shard in range(count)]
+        selected = set()
+        # the path breaks ties, so every shard assigns files the same way
+        for filename in sorted(filenames, key=lambda f: (-sizes[f], get_shard_key(f))):
+            total, shard = heapq.heappop(totals)
+            heapq.heappush(totals, (total + sizes[filename], shard))
+            if shard == index - 1:
+                selected.add(filename)
+        return [filename for filename in filenames if filename in selected]
+
+    return [filename for filename in filenames if get_shard(filename, count) == index - 1]
+
+
+def get_shard(filename: str, count: int) -> int:
+    # not hash(), which is randomized for each process
+    digest = hashlib.sha256(get_shard_key(filename).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def get_shard_key(filename: str) -> str:
+    return os.path.normpath(filename).replace(os.sep, "/")
+
+
+def merge_findings(filenames: Iterable[str]) -> List[Finding]:
+    """Read the findings in files of JSON Lines, sorted and without duplicates."""
+    findings = set()
+    for filename in filenames:
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    findings.add(Finding.from_record(json.loads(line)))
+    return sorted(findings)
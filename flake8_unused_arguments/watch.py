@@ -0,0 +1,308 @@
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import ClassVar, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from flake8_unused_arguments import Finding, Options, Profiles, get_file_options, mypyc_attr
+from flake8_unused_arguments.baseline import Baseline
+from flake8_unused_arguments.cache import ResultCache, StatementCache
+from flake8_unused_arguments.class_index import ClassIndex
+from flake8_unused_arguments.files import check_file, check_files, find_python_files, is_excluded
+
+
+def watch(
+    paths: Sequence[str],
+    exclude: Sequence[str],
+    filenames: Sequence[str],
+    options: Options,
+    jobs: int = 1,
+    cache: Optional["ResultCache"] = None,
+    executor: str = "process",
+    index: Optional["ClassIndex"] = None,
+    watcher: Optional["Watcher"] = None,
+    low_memory: bool = False,
+    baseline: Optional["Baseline"] = None,
+    profiles: Optional[Profiles] = None,
+) -> int:
+    """Check the given files, then check them again as they change until interrupted.
+
+    Only files that change are checked again, and everything that's reported
+    is printed again after each change. If an index is given, it's updated as
+    files change, and files are checked again if what they override changes.
+    Findings in the baseline, if given, aren't reported. When a file is
+    checked again, only the top-level statements that changed are checked.
+    """
+    if watcher is None:
+        watcher = make_watcher(paths, exclude)
+    # the first check of each file is done in parallel, and fills it on the first change
+    statements = StatementCache()
+
+    def get_overrides(filenames: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+        if index is None:
+            return {}
+        return {filename: index.get_overrides(filename) for filename in filenames}
+
+    def check(filename: str, file_options: Options) -> List[Finding]:
+        results = check_file(filename, None, file_options, cache, low_memory, statements)
+        return results if baseline is None else baseline.filter(results)
+
+    overrides = get_overrides(filenames)
+    initial_results = check_files(
+        filenames,
+        options,
+        jobs,
+        cache,
+        executor=executor,
+        overrides=None if index is None else overrides,
+        low_memory=low_memory,
+        profiles=profiles,
+    )
+    if baseline is not None:
+        initial_results = map(baseline.filter, initial_results)
+    results = dict(zip(filenames, initial_results))
+    print_watched_results(results)
+
+    # paths are compared absolutely, as they're named relative to different roots
+    absolute_names = {filename: os.path.abspath(filename) for filename in filenames}
+    files = {os.path.abspath(path): path for path in paths if not os.path.isdir(path)}
+    directories = [os.path.join(os.path.abspath(path), "") for path in paths if os.path.isdir(path)]
+    try:
+        while True:
+            changed = set()
+            for path in watcher.wait():
+                absolute = os.path.abspath(path)
+                # forget anything that was in a directory, or a file, that changed
+                for filename in list(results):
+                    name = absolute_names[filename]
+                    if name == absolute or name.startswith(os.path.join(absolute, "")):
+                        del results[filename]
+                        changed.add(filename)
+
+                if absolute in files:
+                    changed.add(files[absolute])
+                elif not any(absolute.startswith(directory) for directory in directories):
+                    continue
+                elif os.path.isdir(path):
+                    changed.update(find_python_files([path], exclude))
+                elif path.endswith(".py") and not is_excluded(path, exclude):
+                    changed.add(path)
+
+            if not changed:
+                continue
+
+            existing = sorted(filename for filename in changed if os.path.isfile(filename))
+            for filename in existing:
+                absolute_names.setdefault(filename, os.path.abspath(filename))
+            if index is not None:
+                before = {path: index.get_classes(path) for path in map(os.path.abspath, changed)}
+                index.update(existing)
+                if any(index.get_classes(path) != classes for path, classes in before.items()):
+                    # the classes changed, so what overrides what may have too
+                    new_overrides = get_overrides(list(results) + existing)
+                    existing.extend(
+                        filename
+                        for filename in results
+                        if new_overrides[filename] != overrides.get(filename)
+                    )
+                    overrides = new_overrides
+                else:
+                    overrides.update(get_overrides(existing))
+
+            for filename in existing:
+                file_options = get_file_options(
+                    filename, options, profiles, None if index is None else overrides
+                )
+                results[filename] = check(filename, file_options)
+
+            print_watched_results(results)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+    return 1 if any(results.values()) else 0
+
+
+def print_watched_results(results: Dict[str, List[Finding]]) -> None:
+    if sys.stdout.isatty():
+        # clear the screen, so only the current results are shown
+        print("\033[2J\033[H", end="")
+
+    count = 0
+    for filename in sorted(results):
+        for finding in results[filename]:
+            print("{}:{}:{}: {}".format(filename, finding.line, finding.col + 1, finding.message))
+            count += 1
+
+    print(
+        "{} findings in {} files, watching for changes...".format(count, len(results)),
+        file=sys.stderr,
+    )
+    sys.stdout.flush()
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class Watcher:
+    """Waits for files to change."""
+
+    def wait(self) -> Set[str]:
+        """Wait until something changes, returning the files and directories that did."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(paths: Sequence[str], exclude: Sequence[str]) -> Watcher:
+    """Get an InotifyWatcher if inotify is available, or a PollingWatcher otherwise."""
+    try:
+        return InotifyWatcher(paths, exclude)
+    except OSError:
+        return PollingWatcher(paths, exclude)
+
+
+class PollingWatcher(Watcher):
+    """Watch for changes by looking for files and comparing their modification times."""
+
+    def __init__(self, paths: Sequence[str], exclude: Sequence[str], interval: float = 0.5):
+        self.paths = paths
+        self.exclude = exclude
+        self.interval = interval
+        self._stamps = self._get_stamps()
+
+    def wait(self) -> Set[str]:
+        while True:
+            time.sleep(self.interval)
+            stamps = self._get_stamps()
+            changed = {
+                filename
+                for filename in stamps.keys() | self._stamps.keys()
+                if stamps.get(filename) != self._stamps.get(filename)
+            }
+            self._stamps = stamps
+            if changed:
+                return changed
+
+    def _get_stamps(self) -> Dict[str, Tuple[int, int]]:
+        stamps = {}
+        for filename in find_python_files(self.paths, self.exclude):
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            stamps[filename] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+
+class InotifyWatcher(Watcher):
+    """Watch for changes with Linux's inotify, called through ctypes.
+
+    Every directory is watched, as inotify isn't recursive. OSError is raised
+    if inotify isn't available, or there are too many directories to watch.
+    """
+
+    IN_CLOSE_WRITE: ClassVar[int] = 0x8
+    IN_MOVED_FROM: ClassVar[int] = 0x40
+    IN_MOVED_TO: ClassVar[int] = 0x80
+    IN_CREATE: ClassVar[int] = 0x100
+    IN_DELETE: ClassVar[int] = 0x200
+    IN_Q_OVERFLOW: ClassVar[int] = 0x4000
+    IN_ISDIR: ClassVar[int] = 0x40000000
+    IN_CLOEXEC: ClassVar[int] = 0o2000000
+
+    MASK: ClassVar[int] = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT: ClassVar[struct.Struct] = struct.Struct("iIII")
+
+    # how long to wait for more events after one, as saving a file can take several
+    settle = 0.05
+
+    def __init__(self, paths: Sequence[str], exclude: Sequence[str]) -> None:
+        self.paths = paths
+        self.exclude = exclude
+        self._directories: Dict[int, str] = {}
+
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self._add_watch = self._libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError("inotify isn't available: {}".format(e))
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        try:
+            for path in paths:
+                if os.path.isdir(path):
+                    self._watch_tree(path)
+                else:
+                    self._watch(os.path.dirname(path) or ".")
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self) -> Set[str]:
+        changed: Set[str] = set()
+        while not changed:
+            select.select([self._fd], [], [])
+            while select.select([self._fd], [], [], self.settle)[0]:
+                changed.update(self._read())
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _read(self) -> Set[str]:
+        changed: Set[str] = set()
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # events were lost, so anything could have changed
+                changed.update(self.paths)
+                continue
+
+            directory = self._directories.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._watch_tree(path)
+                changed.add(path)
+            elif path.endswith(".py"):
+                changed.add(path)
+
+        return changed
+
+    def _watch_tree(self, root: str) -> None:
+        if is_excluded(root, self.exclude):
+            return
+        for directory, directories, _ in os.walk(root):
+            directories[:] = [
+                name
+                for name in directories
+                if not is_excluded(os.path.join(directory, name), self.exclude)
+            ]
+            self._watch(directory)
+
+    def _watch(self, directory: str) -> None:
+        wd = self._add_watch(self._fd, os.fsencode(directory), self.MASK)
+        if wd >= 0:
+            self._directories[wd] = directory
+        elif ctypes.get_errno() != errno.ENOENT:
+            # e.g. ENOSPC, for too many watches
+            raise OSError(ctypes.get_errno(), "couldn't watch {}".format(directory))
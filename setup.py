@@ -1,9 +1,24 @@
+import glob
+import os
+
 from setuptools import setup
 
 requires = [
     "flake8 > 3.0.0",
 ]
 
+# FLAKE8_UNUSED_ARGUMENTS_MYPYC=1 also compiles the package's modules with mypyc.
+# The pure Python modules are still installed, and are imported wherever the
+# extensions can't be, e.g. by other versions of Python
+ext_modules = []
+if os.environ.get("FLAKE8_UNUSED_ARGUMENTS_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    modules = sorted(glob.glob("flake8_unused_arguments/*.py"))
+    modules.remove("flake8_unused_arguments/__main__.py")
+    ext_modules = mypycify(modules + ["--ignore-missing-imports"])
+    requires.append("mypy_extensions >= 0.4.0")
+
 setup(
     name="flake8-unused-arguments",
     license="MIT",
@@ -11,13 +26,15 @@ setup(
     description="flake8 extension to warn on unused function arguments",
     author="Nathan Hoad",
     author_email="nathan@hoad.io",
-    py_modules=["flake8_unused_arguments"],
+    packages=["flake8_unused_arguments"],
+    ext_modules=ext_modules,
     url="https://github.com/nhoad/flake8-unused-arguments",
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
     install_requires=requires,
     entry_points={
         "flake8.extension": ["U10 = flake8_unused_arguments:Plugin"],
+        "console_scripts": ["flake8-unused-arguments = flake8_unused_arguments.cli:main"],
     },
     classifiers=[
         "Framework :: Flake8",
@@ -1,8 +1,16 @@
 import ast
+import io
+import json
+import os
 import re
 import subprocess
+import sys
 import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import nullcontext
+from dataclasses import replace
 from unittest.mock import patch
 
 import pytest
@@ -81,6 +89,19 @@ def test_get_unused_arguments(function, expected_names):
     assert argument_names == expected_names
 
 
+def test_get_unused_arguments_subset():
+    from flake8_unused_arguments import get_arguments, get_unused_arguments
+
+    function = get_function("def foo(self, a, b, c): return b")
+    arguments = list(enumerate(get_arguments(function)))[1:]
+
+    assert [(i, a.arg) for i, a in get_unused_arguments(function, arguments)] == [
+        (1, "a"),
+        (3, "c"),
+    ]
+    assert get_unused_arguments(function, []) == []
+
+
 @pytest.mark.parametrize(
     "function, expected_result",
     [
@@ -95,6 +116,17 @@ def test_get_unused_arguments(function, expected_names):
     """,
             ["a", "b", "c", "d"],
         ),
+        (
+            """
+    @buttons[0].clicked.connect
+    @handlers[0]
+    @factories[0]()
+    @(lambda f: f)
+    def foo():
+        pass
+    """,
+            ["connect"],
+        ),
         ("lambda g: 5", []),
     ],
 )
@@ -420,6 +452,48 @@ def test_integration(function, options, expected_warnings):
         assert warnings == expected_warnings
 
 
+def test_plugin_options():
+    from flake8_unused_arguments import Options, Plugin
+
+    tree = ast.parse("def foo(*args): pass")
+
+    with patch.object(Plugin, "ignore_variadic_names", True):
+        assert list(Plugin(tree).run()) == []
+        assert list(Plugin(tree, options=Options()).run()) == [
+            (1, 9, "U100 Unused argument 'args'", "unused argument"),
+        ]
+
+
+def test_plugin_options_in_threads(tmp_path):
+    from flake8_unused_arguments import Options, Plugin, Profiles
+
+    tree = ast.parse("def foo(a, *args): pass")
+    variants = [Options(), Options(ignore_variadic_names=True)]
+    expected = [list(Plugin(tree, options=options).run()) for options in variants]
+
+    def run(i):
+        return list(Plugin(tree, options=variants[i % 2]).run())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for i, results in enumerate(executor.map(run, range(200))):
+            assert results == expected[i % 2]
+
+    # options parsed again, as flake8 does for each run, don't change checks
+    # that have already started
+    plugins = [Plugin(tree) for _ in range(200)]
+    statistics_file = tmp_path / "statistics.jsonl"
+    with patch.multiple(
+        Plugin,
+        statistics_file=str(statistics_file),
+        class_index_file=str(tmp_path / "classes.index"),
+        profiles=Profiles.parse("*: ignore-variadic-names"),
+    ):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for results in executor.map(lambda plugin: list(plugin.run()), plugins):
+                assert results == expected[0]
+    assert not statistics_file.exists()
+
+
 @pytest.mark.release
 def test_check_version() -> None:
     from flake8_unused_arguments import Plugin
@@ -464,6 +538,130 @@ def test_function_finder(only_top_level, expected):
     assert names == expected
 
 
+@pytest.mark.parametrize(
+    "code",
+    [
+        FF_CODE,
+        "def foo(a, b=a): pass",
+        "@decorate(a)\ndef foo(a): pass",
+        "def foo(a, b=lambda c: a): pass",
+        "def foo(a, b: a = 1) -> b: pass",
+        "def foo(a):\n    del a",
+        "def foo(a):\n    a = 1",
+        "def foo(a, a): pass",
+        "def foo(a):\n    def bar(a):\n        return a",
+        "def foo(a):\n    def bar(b=a):\n        pass",
+        "def foo(a, b):\n    class Bar:\n        def baz(self, c):\n            return a, c",
+        "zed = lambda c: lambda d: lambda e: c + e",
+        "@thing(lambda x: 1)\nclass Foo:\n    def bar(self, y): pass",
+    ],
+)
+@pytest.mark.parametrize("only_top_level", [False, True])
+def test_scope_analyzer(code, only_top_level):
+    from flake8_unused_arguments import (
+        FunctionFinder,
+        ScopeAnalyzer,
+        get_unused_arguments,
+    )
+
+    tree = ast.parse(code)
+    finder = FunctionFinder(only_top_level=only_top_level)
+    finder.visit(tree)
+    analyzer = ScopeAnalyzer(only_top_level=only_top_level)
+    analyzer.visit(tree)
+
+    assert analyzer.functions == finder.functions
+    for function in finder.functions:
+        assert analyzer.unused_arguments[function] == get_unused_arguments(function)
+
+
+def test_scope_analyzer_deep_nesting():
+    from flake8_unused_arguments import ScopeAnalyzer
+
+    depth = 50
+    code = "".join(
+        "{}def f{}(a{}, b{}):\n".format("    " * i, i, i, i) for i in range(depth)
+    ) + "    " * depth + "return a0\n"
+
+    analyzer = ScopeAnalyzer()
+    analyzer.visit(ast.parse(code))
+    unused = [
+        [argument.arg for _, argument in analyzer.unused_arguments[function]]
+        for function in analyzer.functions
+    ]
+
+    assert unused == [["b0"]] + [["a{}".format(i), "b{}".format(i)] for i in range(1, depth)]
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("def foo(a, b):\n    return b", ["a"]),
+        ("def foo(a):\n    return lambda: a", []),
+        ("def foo(a):\n    del a", []),
+        ("def foo(a):\n    a = 1", ["a"]),
+        ("def foo(a):\n    return [a for a in ()]", ["a"]),
+        ("def foo(a):\n    def bar():\n        global a\n        return a", ["a"]),
+        ("def foo(a):\n    def bar(a):\n        return a", ["a"]),
+        ("def foo(a):\n    def bar(b=a):\n        return b", []),
+        ("def foo(a: int) -> a: pass", ["a"]),
+        ("def foo(a):\n    class Bar:\n        def baz(self):\n            return a", []),
+        ("class Foo:\n    def bar(self, __a, __b):\n        return __b", ["__a"]),
+        ("class _Foo:\n    def bar(self, __a, __b):\n        return lambda: __b", ["__a"]),
+        ("class _:\n    def bar(self, __a, __b):\n        return __b", ["__a"]),
+        # only names in a class are mangled, so y__x is another name
+        ("def f(__x):\n    y__x = 1\n    return __x", []),
+        # same name and line, so the ast engine is used
+        ("foo = lambda a: lambda a: 1", ["a", "a"]),
+        # not valid for the compiler, so the ast engine is used
+        ("def foo(a):\n    nonlocal a", ["a"]),
+    ],
+)
+def test_symtable_engine(code, expected):
+    from flake8_unused_arguments import Options, find_unused_arguments
+
+    tree = ast.parse(code)
+    unused = find_unused_arguments(tree, Options(engine="symtable"), source=code)
+
+    assert [u.argument.arg for u in unused] == expected
+
+
+def test_symtable_engine_without_source():
+    from flake8_unused_arguments import Options, Plugin, check
+
+    code = "def foo(a):\n    def bar(a):\n        return a"
+    options = Options(engine="symtable")
+
+    assert check(code, options) == [(1, 8, "U100 Unused argument 'a'", "unused argument")]
+    assert check(ast.parse(code), options) == []
+    assert list(Plugin(ast.parse(code), lines=code.splitlines(True), options=options).run())
+    with patch.object(Plugin, "engine", "symtable"):
+        assert list(Plugin(ast.parse(code), lines=code.splitlines(True)).run())
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        FF_CODE,
+        "@decorate(lambda a: 1)\ndef foo(b): pass",
+        "@decorate(\n    lambda a: 1,\n)\nclass Foo:\n    x = 1",
+        "x = [\n    1,\n    lambda a: a,\n]",
+    ],
+)
+@pytest.mark.parametrize("only_top_level", [False, True])
+def test_line_function_finder(code, only_top_level):
+    from flake8_unused_arguments import FunctionFinder, FunctionTables, LineFunctionFinder
+
+    tree = ast.parse(code)
+    finder = FunctionFinder(only_top_level)
+    finder.visit(tree)
+    line_finder = LineFunctionFinder(FunctionTables(code).lines, only_top_level)
+    line_finder.visit(tree)
+
+    assert line_finder.functions == finder.functions
+    assert line_finder.scopes == finder.scopes
+
+
 @pytest.mark.parametrize(
     "code, expected_value",
     [
@@ -488,6 +686,1133 @@ def test_is_dunder_method(code, expected_value):
     assert is_dunder_method(func) == expected_value
 
 
+@pytest.mark.parametrize(
+    "jobs", [["-j", "1"], ["-j", "2"], ["-j", "2", "--executor", "thread"]]
+)
+def test_main(tmp_path, capsys, jobs):
+    from flake8_unused_arguments.cli import main
+
+    (tmp_path / "a.py").write_text("def foo(a, b):\n    return b\n")
+    (tmp_path / "b.py").write_text("def foo(*args):\n    pass\n")
+    (tmp_path / "c.txt").write_text("def foo(a): pass\n")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "d.py").write_text("def foo(a): pass\n")
+
+    assert main([str(tmp_path), *jobs, "--no-cache"]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "{}:1:9: U100 Unused argument 'a'".format(tmp_path / "a.py"),
+        "{}:1:10: U100 Unused argument 'args'".format(tmp_path / "b.py"),
+    ]
+
+    assert main(
+        [str(tmp_path), *jobs, "--no-cache", "--unused-arguments-ignore-stub-functions"]
+    ) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "{}:1:9: U100 Unused argument 'a'".format(tmp_path / "a.py"),
+    ]
+
+    assert main(
+        [str(tmp_path / "b.py"), "--no-cache", "--unused-arguments-ignore-variadic-names"]
+    ) == 0
+    assert capsys.readouterr().out == ""
+
+
+def test_main_formats(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    (tmp_path / "a.py").write_text("class A:\n    def foo(self, a, _b):\n        pass\n")
+    (tmp_path / "b.py").write_text("def foo(:\n")
+    args = [str(tmp_path), "--no-cache"]
+
+    assert main(args + ["--format", "jsonl"]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[:2] == [
+        {
+            "path": str(tmp_path / "a.py"),
+            "line": 2,
+            "column": 19,
+            "code": "U100",
+            "message": "U100 Unused argument 'a'",
+            "argument": "a",
+            "function": "A.foo",
+        },
+        {
+            "path": str(tmp_path / "a.py"),
+            "line": 2,
+            "column": 22,
+            "code": "U101",
+            "message": "U101 Unused argument '_b'",
+            "argument": "_b",
+            "function": "A.foo",
+        },
+    ]
+    assert records[2]["code"] == "E999"
+    assert records[2]["argument"] is None
+
+    output = tmp_path / "results.sarif"
+    assert main(args + ["--format", "sarif", "--output", str(output)]) == 1
+    assert capsys.readouterr().out == ""
+    log = json.loads(output.read_text())
+    assert log["version"] == "2.1.0"
+    run = log["runs"][0]
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == ["U100", "U101", "E999"]
+    assert [(result["ruleId"], result["level"]) for result in run["results"]] == [
+        ("U100", "warning"),
+        ("U101", "warning"),
+        ("E999", "error"),
+    ]
+    location = run["results"][0]["locations"][0]
+    assert location["physicalLocation"] == {
+        "artifactLocation": {"uri": (tmp_path / "a.py").as_uri()},
+        "region": {"startLine": 2, "startColumn": 19},
+    }
+    assert location["logicalLocations"] == [{"fullyQualifiedName": "A.foo", "kind": "function"}]
+    assert run["results"][0]["properties"] == {"argument": "a"}
+
+
+def test_sarif_writer_empty():
+    from flake8_unused_arguments.formats import SarifWriter
+
+    stream = io.StringIO()
+    SarifWriter(stream).close()
+    assert json.loads(stream.getvalue())["runs"][0]["results"] == []
+
+
+def test_main_syntax_error(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    (tmp_path / "a.py").write_text("def foo(:\n")
+
+    assert main([str(tmp_path), "--no-cache"]) == 1
+    assert capsys.readouterr().out.startswith(
+        "{}:1:9: E999 SyntaxError: ".format(tmp_path / "a.py")
+    )
+
+
+def test_main_missing_path(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "missing.py"), "--no-cache"])
+    assert "no such file or directory: {}".format(tmp_path / "missing.py") in (
+        capsys.readouterr().err
+    )
+
+
+def test_main_cache(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.py").write_text("def foo(a, b):\n    return b\n")
+    args = [str(source), "-j", "1", "--cache-dir", str(tmp_path / "cache")]
+    expected = "{}:1:9: U100 Unused argument 'a'\n".format(source / "a.py")
+
+    assert main(args) == 1
+    assert capsys.readouterr().out == expected
+
+    with patch("ast.parse", side_effect=AssertionError("not cached")):
+        assert main(args) == 1
+    assert capsys.readouterr().out == expected
+
+    # different options mean different results
+    with patch("ast.parse", side_effect=AssertionError("not cached")):
+        with pytest.raises(AssertionError):
+            main(args + ["--unused-arguments-ignore-stub-functions"])
+
+    with patch("ast.parse", side_effect=AssertionError("not cached")):
+        with pytest.raises(AssertionError):
+            main(args + ["--clear-cache"])
+
+    # files with the same source share results, but each is reported at its own path
+    assert main(args) == 1
+    capsys.readouterr()
+    (source / "b.py").write_text("def foo(a, b):\n    return b\n")
+    with patch("ast.parse", side_effect=AssertionError("not cached")):
+        assert main(args) == 1
+    assert capsys.readouterr().out == expected + expected.replace("a.py", "b.py")
+
+
+def write_class_index_project(root):
+    package = root / "pkg"
+    (package / "sub").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "sub" / "__init__.py").write_text("from .base import Base as Base\n")
+    (package / "sub" / "base.py").write_text(
+        "class Base:\n    def handle(self, request):\n        return request\n"
+    )
+    (package / "impl.py").write_text(
+        textwrap.dedent(
+            """\
+            import pkg.sub as s
+            from .sub import Base
+
+            class Impl(Base):
+                def handle(self, request):
+                    pass
+                def other(self, unused):
+                    pass
+
+            class Deeper(s.Base):
+                class Inner(Impl):
+                    def handle(self, request):
+                        pass
+                    def other(self, unused):
+                        pass
+            """
+        )
+    )
+    return package
+
+
+def test_class_index(tmp_path):
+    from flake8_unused_arguments.class_index import ClassIndex
+    from flake8_unused_arguments.files import find_python_files
+
+    package = write_class_index_project(tmp_path)
+    impl = str(package / "impl.py")
+    filenames = list(find_python_files([str(tmp_path)], []))
+
+    index = ClassIndex()
+    assert index.update(filenames) == 4
+    assert index.get_overrides(impl) == (
+        "Deeper.Inner.handle",
+        "Deeper.Inner.other",
+        "Impl.handle",
+    )
+    assert index.update(filenames) == 0
+
+    # the file's own classes can be taken from a newer tree
+    tree = ast.parse("from pkg.sub import Base\nclass Impl(Base):\n    def handle(self, r): pass\n")
+    assert index.get_overrides(impl, tree) == ("Impl.handle",)
+
+    index.save(str(tmp_path / "classes.index"))
+    loaded = ClassIndex.load(str(tmp_path / "classes.index"))
+    assert loaded.modules == index.modules
+    assert loaded.get_overrides(impl) == index.get_overrides(impl)
+
+    (package / "sub" / "base.py").write_text("class Base:\n    pass\n")
+    os.remove(package / "sub" / "__init__.py")
+    assert loaded.update(filenames) == 1
+    assert loaded.get_overrides(impl) == ("Deeper.Inner.handle", "Deeper.Inner.other")
+    assert len(loaded.modules) == 3
+
+    assert ClassIndex.load(str(tmp_path / "missing.index")).modules == {}
+
+
+def test_main_class_index(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    package = write_class_index_project(tmp_path / "src")
+    args = [str(tmp_path / "src"), "-j", "1", "--cache-dir", str(tmp_path / "cache")]
+    expected = [
+        "{}:7:21: U100 Unused argument 'unused'".format(package / "impl.py"),
+    ]
+
+    assert main(args + ["--class-index"]) == 1
+    assert capsys.readouterr().out.splitlines() == expected
+    assert (tmp_path / "cache" / "classes.index").exists()
+
+    # results without the index aren't taken from the cache
+    assert main(args) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 4
+
+    indexed = AssertionError("indexed")
+    with patch("flake8_unused_arguments.class_index.index_file", side_effect=indexed):
+        assert main(args + ["--class-index"]) == 1
+    assert capsys.readouterr().out.splitlines() == expected
+
+    from flake8_unused_arguments import Plugin
+
+    tree = ast.parse((package / "impl.py").read_text())
+    with patch.object(Plugin, "class_index_file", str(tmp_path / "cache" / "classes.index")):
+        results = list(Plugin(tree, str(package / "impl.py")).run())
+    assert [result[:2] for result in results] == [(7, 20)]
+
+
+def test_watch(tmp_path, capsys):
+    from flake8_unused_arguments import Options
+    from flake8_unused_arguments.watch import Watcher, watch
+
+    (tmp_path / "a.py").write_text("def foo(a):\n    pass\n")
+    (tmp_path / "b.py").write_text("def foo(b):\n    return b\n")
+
+    def change_a():
+        (tmp_path / "a.py").write_text("def foo(a):\n    return a\n")
+        # only the files that changed are checked again, so this is never seen
+        (tmp_path / "b.py").write_text("def foo(b):\n    pass\n")
+        return {str(tmp_path / "a.py")}
+
+    def add_directory():
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "c.py").write_text("def foo(c): pass\n")
+        (tmp_path / "sub" / "d.txt").write_text("def foo(d): pass\n")
+        return {str(tmp_path / "sub")}
+
+    def remove_b():
+        os.remove(tmp_path / "b.py")
+        return {str(tmp_path / "b.py"), str(tmp_path.parent / "elsewhere.py")}
+
+    class FakeWatcher(Watcher):
+        changes = [change_a, add_directory, remove_b]
+
+        def wait(self):
+            if not self.changes:
+                raise KeyboardInterrupt
+            return self.changes.pop(0)()
+
+    filenames = [str(tmp_path / "a.py"), str(tmp_path / "b.py")]
+    status = watch([str(tmp_path)], [], filenames, Options(), watcher=FakeWatcher())
+
+    assert status == 1
+    c = "{}:1:9: U100 Unused argument 'c'".format(tmp_path / "sub" / "c.py")
+    assert capsys.readouterr().out.splitlines() == [
+        "{}:1:9: U100 Unused argument 'a'".format(tmp_path / "a.py"),
+        c,
+        c,
+    ]
+
+
+def test_polling_watcher(tmp_path):
+    from flake8_unused_arguments.watch import PollingWatcher
+
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / "b.py").write_text("")
+    watcher = PollingWatcher([str(tmp_path)], [], interval=0.01)
+
+    (tmp_path / "a.py").write_text("x = 1\n")
+    os.remove(tmp_path / "b.py")
+    (tmp_path / "c.py").write_text("")
+    (tmp_path / "d.txt").write_text("")
+
+    assert watcher.wait() == {str(tmp_path / name) for name in ["a.py", "b.py", "c.py"]}
+
+
+def test_inotify_watcher(tmp_path):
+    from flake8_unused_arguments.watch import InotifyWatcher
+
+    (tmp_path / "excluded").mkdir()
+    try:
+        watcher = InotifyWatcher([str(tmp_path)], ["excluded"])
+    except OSError:
+        pytest.skip("inotify isn't available")
+
+    try:
+        (tmp_path / "a.py").write_text("")
+        (tmp_path / "excluded" / "b.py").write_text("")
+        (tmp_path / "c.txt").write_text("")
+        assert watcher.wait() == {str(tmp_path / "a.py")}
+
+        (tmp_path / "sub").mkdir()
+        assert watcher.wait() == {str(tmp_path / "sub")}
+        # the new directory is watched too
+        (tmp_path / "sub" / "d.py").write_text("")
+        assert watcher.wait() == {str(tmp_path / "sub" / "d.py")}
+    finally:
+        watcher.close()
+
+
+def test_baseline(tmp_path):
+    from flake8_unused_arguments import Finding
+    from flake8_unused_arguments.baseline import Baseline
+
+    path = str(tmp_path / "a.py")
+    findings = [
+        Finding(path, 1, 8, "U100", "a", "foo"),
+        Finding(path, 2, 15, "U100", "b", "foo.<locals>.<lambda>"),
+        Finding(path, 3, 15, "U100", "b", "foo.<locals>.<lambda>"),
+    ]
+    baseline = Baseline(str(tmp_path))
+    baseline.record(path, findings[:2])
+    assert baseline.entries == {
+        "a.py": {("foo", "a"): 1, ("foo.<locals>.<lambda>", "b"): 1}
+    }
+
+    # lines don't matter, but each recorded finding only suppresses one
+    moved = [finding._replace(line=finding.line + 10) for finding in findings]
+    syntax_error = Finding(path, 1, 0, "E999", "", "", "E999 SyntaxError: invalid syntax")
+    assert baseline.filter(moved + [syntax_error]) == [moved[2], syntax_error]
+
+    baseline.save(str(tmp_path / "baseline.json"))
+    loaded = Baseline.load(str(tmp_path / "baseline.json"))
+    assert loaded.entries == baseline.entries
+    assert len(loaded) == 2
+
+    loaded.prune(path, findings[1:])
+    assert loaded.entries == {"a.py": {("foo.<locals>.<lambda>", "b"): 1}}
+    loaded.prune_missing()
+    assert loaded.entries == {}
+
+    (tmp_path / "bad.json").write_text('{"version": 1, "findings": []}')
+    with pytest.raises(ValueError):
+        Baseline.load(str(tmp_path / "bad.json"))
+
+
+def test_main_baseline(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    (tmp_path / "a.py").write_text("def foo(a, b):\n    pass\n")
+    (tmp_path / "b.py").write_text("def bar(c):\n    pass\n")
+    baseline = str(tmp_path / "baseline.json")
+    args = [str(tmp_path), "--no-cache", "--baseline", baseline]
+
+    assert main(args + ["--update-baseline"]) == 0
+    assert "3 findings recorded" in capsys.readouterr().err
+    assert main(args) == 0
+
+    # moving a function doesn't report it again, but new arguments are
+    (tmp_path / "a.py").write_text("\n\ndef foo(a, b, d):\n    return b\n")
+    assert main(args) == 1
+    assert capsys.readouterr().out == "{}:3:15: U100 Unused argument 'd'\n".format(
+        tmp_path / "a.py"
+    )
+
+    (tmp_path / "b.py").unlink()
+    assert main(args + ["--prune-baseline"]) == 1
+    capsys.readouterr()
+    with open(baseline) as f:
+        assert json.load(f)["findings"] == {"a.py": {"foo": {"a": 1}}}
+
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--update-baseline"])
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--baseline", str(tmp_path / "missing.json")])
+
+
+def test_select_shard(tmp_path):
+    from flake8_unused_arguments.shard import select_shard
+
+    filenames = ["pkg/module{}.py".format(i) for i in range(100)]
+    shards = [select_shard(filenames, index, 4) for index in range(1, 5)]
+    assert sorted(sum(shards, [])) == sorted(filenames)
+    assert all(shard for shard in shards)
+    # paths are hashed the same way on every platform
+    assert select_shard(["pkg/module0.py"], 1, 4) == select_shard(
+        [os.path.join("pkg", "module0.py")], 1, 4
+    )
+    # adding a file doesn't move the others
+    assert select_shard(filenames + ["new.py"], 1, 4)[: len(shards[0])] == shards[0]
+
+    for size, name in [(100, "a.py"), (60, "b.py"), (50, "c.py"), (30, "d.py")]:
+        (tmp_path / name).write_text("#" * size)
+    filenames = sorted(str(path) for path in tmp_path.iterdir())
+    assert select_shard(filenames, 1, 2, by_size=True) == [
+        str(tmp_path / "a.py"),
+        str(tmp_path / "d.py"),
+    ]
+    assert select_shard(filenames, 2, 2, by_size=True) == [
+        str(tmp_path / "b.py"),
+        str(tmp_path / "c.py"),
+    ]
+
+
+def test_main_shard_merge(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    for i in range(10):
+        (tmp_path / "m{}.py".format(i)).write_text("def foo(a):\n    pass\n")
+    (tmp_path / "bad.py").write_text("def foo(:\n")
+    args = [str(tmp_path), "--no-cache", "--format", "jsonl"]
+
+    outputs = []
+    for index in range(1, 4):
+        output = str(tmp_path / "shard{}.jsonl".format(index))
+        main(args + ["--shard", "{}/3".format(index), "--output", output])
+        outputs.append(output)
+    # merging the same shard twice doesn't duplicate its findings
+    assert main(["--merge", "--format", "jsonl"] + outputs + outputs[:1]) == 1
+    merged = capsys.readouterr().out
+
+    assert main(args) == 1
+    assert merged == capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        main(args + ["--shard", "4/3"])
+    with pytest.raises(SystemExit):
+        main(args + ["--shard-by-size"])
+
+
+@pytest.mark.parametrize(
+    "fix, source, expected, skipped",
+    [
+        (
+            "prefix",
+            "def foo(é, *args, b, **kwargs):\n    pass\n",
+            "def foo(é, *_args, b, **_kwargs):\n    pass\n",
+            ["é", "b"],
+        ),
+        (
+            "prefix",
+            "def foo(*a, _b):\n    return lambda *_a, **c: 1\n",
+            "def foo(*a, _b):\n    return lambda *_a, **_c: 1\n",
+            ["a", "_b", "_a"],
+        ),
+        (
+            "del",
+            "def foo(a, *, b):\n    '''Doc.'''\n    @decorator\n    def bar(c):\n        pass\n",
+            (
+                "def foo(a, *, b):\n    '''Doc.'''\n    del a, b\n    @decorator\n"
+                "    def bar(c):\n        del c\n        pass\n"
+            ),
+            [],
+        ),
+        (
+            "del",
+            "def foo(a):\r\n    '''Doc.'''",
+            "def foo(a):\r\n    '''Doc.'''\n    del a\n",
+            [],
+        ),
+        (
+            "del",
+            "def foo(a): pass\nbar = lambda b: 1\n",
+            "def foo(a): pass\nbar = lambda b: 1\n",
+            ["a", "b"],
+        ),
+        (
+            "del",
+            "class A(B):\n    def m(this, a):\n        return super().m()\n",
+            "class A(B):\n    def m(this, a):\n        return super().m()\n",
+            ["this", "a"],
+        ),
+    ],
+)
+def test_fix_source(fix, source, expected, skipped):
+    from flake8_unused_arguments import Options, find_unused_arguments
+    from flake8_unused_arguments.fix import fix_source
+
+    unused = list(find_unused_arguments(ast.parse(source), Options()))
+    fixed, not_fixed = fix_source(source.encode(), unused, fix)
+    assert fixed.decode() == expected
+    assert [unused.argument.arg for unused in not_fixed] == skipped
+    if fix == "del":
+        fixed_unused = find_unused_arguments(ast.parse(fixed), Options())
+        assert [unused.argument.arg for unused in fixed_unused] == skipped
+
+
+def test_main_fix(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    source = "# -*- coding: latin-1 -*-\ndef foo(*a, b):\n    return '\xe9'\n"
+    for i in range(4):
+        (tmp_path / "m{}.py".format(i)).write_bytes(source.encode("latin-1"))
+    args = [str(tmp_path), "--no-cache", "-j", "2", "--executor", "thread"]
+
+    assert main(args + ["--fix", "prefix"]) == 1
+    out, err = capsys.readouterr()
+    assert len(out.splitlines()) == 4
+    assert "4 arguments fixed, 4 not" in err
+    assert (tmp_path / "m0.py").read_bytes() == source.replace("(*a", "(*_a").encode("latin-1")
+
+    # including those prefixed by the first fix
+    assert main(args + ["--fix", "del"]) == 0
+    assert "8 arguments fixed, 0 not" in capsys.readouterr().err
+    assert main(args) == 0
+
+
+def test_result_cache_prune(tmp_path):
+    from flake8_unused_arguments import Options
+    from flake8_unused_arguments.cache import ResultCache
+
+    cache = ResultCache(str(tmp_path))
+    keys = [cache.key(str(i).encode(), Options()) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, [(1, 2, "U100 Unused argument 'a'", "unused argument")])
+        os.utime(os.path.join(str(tmp_path), key + ".json"), (i, i))
+
+    # reading an entry makes it the most recently used
+    assert cache.get(keys[0]) == [(1, 2, "U100 Unused argument 'a'", "unused argument")]
+
+    size = os.path.getsize(os.path.join(str(tmp_path), keys[0] + ".json"))
+    cache.prune(size * 2)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+    assert cache.get(keys[0]) is not None
+
+
+def test_parse_unified_diff():
+    from flake8_unused_arguments import LineRanges
+    from flake8_unused_arguments.git import parse_unified_diff
+
+    diff = textwrap.dedent(
+        """\
+        diff --git a/a.py b/a.py
+        --- a/a.py
+        +++ b/a.py
+        @@ -1 +1 @@
+        -x
+        +y
+        @@ -10,0 +11,3 @@ def foo():
+        +1
+        +2
+        +3
+        @@ -20,2 +22,0 @@
+        -4
+        -5
+        diff --git a/b.py b/b.py
+        deleted file mode 100644
+        --- a/b.py
+        +++ /dev/null
+        @@ -1 +0,0 @@
+        -z
+        """
+    )
+
+    assert parse_unified_diff(diff.splitlines()) == {
+        "a.py": LineRanges([(1, 1), (11, 13), (22, 23)]),
+    }
+
+
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [(1, 4, False), (1, 5, True), (7, 8, True), (11, 19, False), (12, 30, True)],
+)
+def test_line_ranges_overlaps(start, end, expected):
+    from flake8_unused_arguments import LineRanges
+
+    assert LineRanges([(5, 6), (20, 25), (7, 10)]).overlaps(start, end) == expected
+
+
+def test_plugin_changed_lines():
+    from flake8_unused_arguments import LineRanges, Plugin
+
+    code = textwrap.dedent(
+        """\
+        def foo(a):
+            pass
+
+        @decorator
+        def bar(b):
+            def baz(c):
+                pass
+        """
+    )
+
+    def run(*ranges):
+        tree = ast.parse(code)
+        return [text for _, _, text, _ in Plugin(tree, changed_lines=LineRanges(ranges)).run()]
+
+    assert run() == []
+    assert run((1, 1)) == ["U100 Unused argument 'a'"]
+    assert run((3, 4)) == ["U100 Unused argument 'b'"]
+    assert run((7, 7)) == ["U100 Unused argument 'b'", "U100 Unused argument 'c'"]
+
+
+def test_main_diff(tmp_path, monkeypatch, capsys):
+    from flake8_unused_arguments.cli import main
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("def foo(a):\n    pass\ndef bar(b):\n    pass\n")
+    (tmp_path / "b.py").write_text("def foo(a):\n    pass\n")
+    diff = "--- a/a.py\n+++ b/a.py\n@@ -3,0 +4 @@\n+    pass\n"
+    monkeypatch.setattr("sys.stdin", io.StringIO(diff))
+
+    assert main(["--diff", "-", "--no-cache"]) == 1
+    assert capsys.readouterr().out == "a.py:3:9: U100 Unused argument 'b'\n"
+
+
+def test_main_git(tmp_path, monkeypatch, capsys):
+    from flake8_unused_arguments.cli import main
+    from flake8_unused_arguments.git import GitObjectReader, iter_git_sources
+
+    def git(*args):
+        subprocess.run(
+            ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"] + list(args),
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("def foo(a):\n    pass\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "b.py").write_text("def foo(b):\n    pass\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "first")
+
+    (tmp_path / "pkg" / "a.py").write_text("def foo(c):\n    pass\n")
+    git("add", ".")
+    (tmp_path / "pkg" / "a.py").write_text("def foo(d):\n    pass\n")
+
+    args = ["--no-cache", "--exclude", "build"]
+    assert main(args + ["--git-rev", "HEAD"]) == 1
+    assert capsys.readouterr().out == "pkg/a.py:1:9: U100 Unused argument 'a'\n"
+    assert main(args + ["--staged"]) == 1
+    assert capsys.readouterr().out == "pkg/a.py:1:9: U100 Unused argument 'c'\n"
+    assert main(args + ["--git-rev", "HEAD", "build"]) == 0
+    # more than one file, so the checks are done in worker processes
+    assert main(["--no-cache", "--git-rev", "HEAD", "-j", "2"]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "build/b.py:1:9: U100 Unused argument 'b'",
+        "pkg/a.py:1:9: U100 Unused argument 'a'",
+    ]
+
+    sources = list(iter_git_sources("HEAD"))
+    assert sources == [
+        ("build/b.py", b"def foo(b):\n    pass\n"),
+        ("pkg/a.py", b"def foo(a):\n    pass\n"),
+    ]
+
+    with GitObjectReader() as reader:
+        with pytest.raises(KeyError):
+            reader.read("0" * 40)
+        assert reader.read("HEAD:pkg/a.py") == sources[1][1]
+
+    with pytest.raises(SystemExit):
+        main(args + ["--git-rev", "nonexistent"])
+
+
+def test_check_sources():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from flake8_unused_arguments import Finding, Options
+    from flake8_unused_arguments.files import check_sources
+
+    sources = [("m{}.py".format(i), "def foo(a{}): pass\n".format(i).encode()) for i in range(10)]
+    with patch("concurrent.futures.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as pool:
+        results = check_sources(sources, Options(), jobs=2, executor="thread", batch_size=3)
+        assert [findings[0].path for findings in results] == [path for path, _ in sources]
+    # every batch is checked by the same workers
+    assert pool.call_count == 1
+    assert list(check_sources(sources[:1], Options(), jobs=2)) == [
+        [Finding("m0.py", 1, 8, "U100", "a0", "foo")]
+    ]
+
+
+
+def test_daemon(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+    from flake8_unused_arguments.daemon import Daemon, DaemonClient
+
+    socket_path = str(tmp_path / "daemon.sock")
+    daemon = Daemon(socket_path)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.01)
+
+        with DaemonClient(socket_path) as client:
+            for _ in range(2):
+                assert client.check("def foo(a): pass\n", "a.py") == [
+                    (1, 8, "U100 Unused argument 'a'", "unused argument"),
+                ]
+            assert client.check("def foo(:\n")[0][2].startswith("E999 SyntaxError: ")
+
+        (tmp_path / "a.py").write_text("def foo(_a): pass\n")
+        assert main(["--socket", socket_path, str(tmp_path / "a.py")]) == 1
+        assert capsys.readouterr().out == "{}:1:9: U101 Unused argument '_a'\n".format(
+            tmp_path / "a.py"
+        )
+        with pytest.raises(SystemExit):
+            main(["--socket", socket_path, "--format", "sarif", str(tmp_path / "a.py")])
+    finally:
+        daemon.shutdown()
+        thread.join()
+
+    assert not os.path.exists(socket_path)
+
+
+def test_check():
+    from flake8_unused_arguments import Options, check
+
+    code = "def foo(a, *args): pass\n"
+    expected = [
+        (1, 8, "U100 Unused argument 'a'", "unused argument"),
+        (1, 12, "U100 Unused argument 'args'", "unused argument"),
+    ]
+
+    assert check(code) == expected
+    assert check(code.encode()) == expected
+    assert check(ast.parse(code)) == expected
+    assert check(code, Options(ignore_variadic_names=True)) == expected[:1]
+    with pytest.raises(SyntaxError):
+        check("def foo(:")
+
+
+def test_iter_findings():
+    from flake8_unused_arguments import Finding, Options, iter_findings
+
+    sources = iter(
+        [
+            ("a.py", "class A:\n    def foo(self, a):\n        return lambda _b: 1\n"),
+            ("b.py", b"def bar(*args): pass\n"),
+        ]
+    )
+    findings = iter_findings(sources, Options(ignore_variadic_names=True))
+
+    assert next(findings) == Finding("a.py", 2, 18, "U100", "a", "A.foo")
+    # the second source isn't read until the first is exhausted
+    assert next(sources, None) is not None
+    assert list(findings) == [
+        Finding("a.py", 3, 22, "U101", "_b", "A.foo.<locals>.<lambda>")
+    ]
+
+    finding = Finding("a.py", 2, 18, "U100", "a", "A.foo")
+    assert finding.message == "U100 Unused argument 'a'"
+    assert finding.as_lint_result() == (
+        2,
+        18,
+        "U100 Unused argument 'a'",
+        "unused argument",
+    )
+
+
+def test_iter_findings_syntax_error():
+    from flake8_unused_arguments import iter_findings
+
+    sources = [("bad.py", "def foo(:"), ("good.py", "def foo(a): pass")]
+    with pytest.raises(SyntaxError):
+        list(iter_findings(sources))
+
+    errors = []
+    findings = iter_findings(
+        sources, on_syntax_error=lambda path, e: errors.append(path)
+    )
+    assert [finding.path for finding in findings] == ["good.py"]
+    assert errors == ["bad.py"]
+
+
+def test_iter_top_level_chunks():
+    from flake8_unused_arguments import iter_top_level_chunks
+
+    source = (
+        "# -*- coding: latin-1 -*-\n"
+        "import os\n"
+        "@decorator\n"
+        "\n"
+        "def foo(a):\n"
+        "    return 1\n"
+        "try:\n"
+        "    x = 1\n"
+        "except ImportError:\n"
+        "    x = '\xe9'\n"
+        "if x:\n"
+        "    pass\n"
+        "else:\n"
+        "    pass\n"
+    ).encode("latin-1")
+
+    assert list(iter_top_level_chunks(source, max_lines=1)) == [
+        (1, "# -*- coding: latin-1 -*-\n"),
+        (2, "import os\n"),
+        (3, "@decorator\n\ndef foo(a):\n    return 1\n"),
+        (7, "try:\n    x = 1\nexcept ImportError:\n    x = '\xe9'\n"),
+        (11, "if x:\n    pass\nelse:\n    pass\n"),
+    ]
+    assert [start for start, _ in iter_top_level_chunks(source, max_lines=5)] == [1, 7]
+    assert list(iter_top_level_chunks(b"")) == []
+
+
+@pytest.mark.parametrize("engine", ["ast", "symtable"])
+def test_get_findings_low_memory(engine):
+    from flake8_unused_arguments import LineRanges, Options, get_findings
+
+    source = "".join(
+        "class A{0}:\n    @property\n    def foo(self, a{0}):\n        return lambda b: 1\n".format(i)
+        for i in range(300)
+    ).encode()
+    options = Options(engine=engine)
+    changed_lines = LineRanges([(598, 602)])
+
+    findings = get_findings(source, options)
+    assert len(findings) == 600
+    assert get_findings(source, options, low_memory=True) == findings
+    assert get_findings(source, options, "a.py", changed_lines, low_memory=True) == (
+        get_findings(source, options, "a.py", changed_lines)
+    )
+    assert get_findings(b"def foo(:\n", low_memory=True) == get_findings(b"def foo(:\n")
+    # not valid UTF-8, which the tokenizer raises UnicodeDecodeError for
+    invalid = b"def foo(a):\n    return '\xff'\n"
+    assert get_findings(invalid, low_memory=True) == get_findings(invalid)
+    assert get_findings(invalid)[0].code == "E999"
+
+    # later chunks are compiled with the module's __future__ imports, under
+    # which annotations aren't uses of the names in them
+    source = (
+        '"""Doc."""\nfrom __future__ import annotations\n' + "x = 1\n" * 600
+        + "def foo(a):\n    def bar(b: a): ...\n"
+    ).encode()
+    findings = get_findings(source, options)
+    expected = ["a", "b"] if engine == "symtable" else ["b"]
+    assert [finding.argument for finding in findings] == expected
+    assert get_findings(source, options, low_memory=True) == findings
+
+
+def test_main_low_memory(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    (tmp_path / "a.py").write_text("def foo(a):\n    pass\n" * 300)
+    assert main([str(tmp_path), "--no-cache", "--low-memory"]) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 300
+
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--low-memory", "--slowest", "1"])
+
+
+@pytest.mark.parametrize("engine", ["ast", "symtable"])
+def test_statement_cache(engine):
+    from flake8_unused_arguments import Finding, Options, get_findings
+    from flake8_unused_arguments.cache import StatementCache
+
+    options = Options(engine=engine)
+    cache = StatementCache()
+    sources = [
+        "",
+        "x = 1\ny = 2\n",
+        "@decorator\n\n@decorator(\n)\ndef foo(a):\n    pass\nx = foo\n",
+        'def foo(a):\n    """Text\ndef bar(b):\n    pass\n"""\n\ndef baz(c): pass',
+        "x = '''\nclass A:\n'''\ndef foo(a): pass\n",
+        "def foo(\n    a,\n): pass\nx = [\n1,\n]\nclass A:\n    def foo(self, a): pass\n",
+        "if x:\n    def foo(a): pass\nelse:\n    def foo(b): pass\n",
+        "try:\n    pass\nexcept E:\n    def foo(a): pass\nfinally:\n    pass\n",
+        "async def foo(a):\n    pass\r\ndef bar(b):\r\n    pass",
+        "def foo(a): pass\ndef bar(:\n    pass\n",
+        "# -*- coding: latin-1 -*-\ndef foo(a='\xe9'): pass\n".encode("latin-1"),
+        # classes are split at their methods
+        "@decorator\nclass A(B):\n    '''Doc.'''\n    @property\n    def foo(self, a): pass\n"
+        "    x = 1\n    async def bar(self, b):\n        class C:\n            def baz(c): pass\n",
+        "class A:\n    def foo(self, __a, __b):\n        return __b\n"
+        "    def bar(self, __c): pass\n",
+        "class A:\n    def foo(self, a):\n        '''\n    def bar(self, b): pass\n'''\n",
+        "class A: pass\nclass B:\n    x = 1\n",
+        # a string in the first column, which makes both classes one statement
+        "class A:\n    x = '''\nx\n'''\n    def foo(self, a): pass\n"
+        "class B:\n    def foo(self, b): pass\n",
+        # pieces are parsed after the module's __future__ imports, and cached
+        # apart from the same text without them
+        "'''Doc.'''\nfrom __future__ import annotations\ndef foo(a):\n    def bar(b: a): ...\n"
+        "class A:\n    x = 1\n    def foo(self, a):\n        def bar(b: a): ...\n",
+        "'''Doc.'''\ndef foo(a):\n    def bar(b: a): ...\n"
+        "class A:\n    x = 1\n    def foo(self, a):\n        def bar(b: a): ...\n",
+    ]
+    for source in sources:
+        assert cache.get_findings(source, options, "a.py") == get_findings(source, options, "a.py")
+
+    source = "".join("def foo{0}(a{0}):\n    pass\n\n\n".format(i) for i in range(100))
+    assert len(cache.get_findings(source, options)) == 100
+    misses = cache.misses
+    # a line added to the fourth function moves the findings of the rest down
+    edited = source.replace("a3):\n", "a3, b):\n    pass\n")
+    findings = cache.get_findings(edited, options)
+    assert cache.misses == misses + 1
+    assert findings == get_findings(edited, options)
+    assert findings[5] == Finding("<unknown>", 18, 9, "U100", "a4", "foo4")
+
+    # the same goes for a method of a class
+    source = "class A:\n" + source.replace("def", "    def").replace("    pass", "        pass")
+    assert len(cache.get_findings(source, options)) == 100
+    misses = cache.misses
+    edited = source.replace("a3):\n", "a3, b):\n        pass\n")
+    findings = cache.get_findings(edited, options)
+    assert cache.misses == misses + 1
+    assert findings == get_findings(edited, options)
+    assert findings[5] == Finding("<unknown>", 19, 13, "U100", "a4", "A.foo4")
+
+    cache = StatementCache(max_size=10)
+    cache.get_findings(source, options)
+    assert len(cache) == 10
+
+
+def test_check_many():
+    import asyncio
+
+    from flake8_unused_arguments import Finding
+    from flake8_unused_arguments.async_checks import check_many, check_source
+
+    async def run():
+        assert await check_source("def foo(a): pass\n", path="a.py") == [
+            Finding("a.py", 1, 8, "U100", "a", "foo")
+        ]
+
+        read = []
+
+        async def sources():
+            for i in range(10):
+                read.append(i)
+                yield "m{}.py".format(i), "def foo(a{}): pass\n".format(i)
+
+        findings = check_many(sources(), limit=3)
+        assert (await findings.__anext__()).path == "m0.py"
+        # only as many sources as are checked at once are read ahead
+        assert read == [0, 1, 2]
+        assert [finding.path async for finding in findings] == [
+            "m{}.py".format(i) for i in range(1, 10)
+        ]
+
+        sources = [("bad.py", "def foo(:"), ("good.py", "def foo(a): pass")]
+        with pytest.raises(SyntaxError):
+            [finding async for finding in check_many(sources)]
+        errors = []
+        findings = check_many(sources, on_syntax_error=lambda path, e: errors.append(path))
+        assert [finding.path async for finding in findings] == ["good.py"]
+        assert errors == ["bad.py"]
+
+        timed_out = []
+        findings = check_many(sources[1:], timeout=0, on_timeout=timed_out.append)
+        assert [finding async for finding in findings] == []
+        assert timed_out == ["good.py"]
+
+        with pytest.raises(ValueError):
+            await check_many(sources, limit=0).__anext__()
+
+    asyncio.run(run())
+
+
+def test_import_without_flake8():
+    code = (
+        "import sys\n"
+        "sys.modules['flake8'] = None\n"
+        "import flake8_unused_arguments\n"
+        "assert flake8_unused_arguments.check('def foo(a): pass')\n"
+        # the CLI, daemon, watcher, git and async parts import these when they're used
+        "lazy = {'asyncio', 'concurrent.futures', 'ctypes', 'multiprocessing', 'select',\n"
+        "        'socket', 'subprocess', 'symtable', 'tempfile'}\n"
+        "assert not lazy & set(sys.modules), lazy & set(sys.modules)\n"
+    )
+    subprocess.check_call([sys.executable, "-c", code], cwd=os.path.dirname(__file__))
+
+
+def test_profile():
+    from flake8_unused_arguments import Options, profile
+
+    code = textwrap.dedent(
+        """\
+        @overload
+        def foo(a): pass
+        def __bar__(self, b):
+            return b
+        def baz(c):
+            def qux(e):
+                return e
+            return c
+        quux = lambda d: 1
+        """
+    )
+    options = Options(
+        ignore_overload=True, ignore_dunder_methods=True, ignore_nested_functions=True
+    )
+
+    unused_arguments, statistics = profile(ast.parse(code), options, "a.py")
+
+    assert [unused.argument.arg for unused in unused_arguments] == ["d"]
+    assert statistics.filename == "a.py"
+    assert statistics.functions == 4
+    assert statistics.findings == 1
+    assert statistics.skipped == {"overload": 1, "dunder": 1, "nested": 1}
+    assert statistics.nodes > 0
+    assert [(name, line) for name, line, _ in statistics.function_seconds] == [
+        ("foo", 2),
+        ("__bar__", 3),
+        ("baz", 5),
+        ("<lambda>", 9),
+    ]
+
+
+def test_profiles(tmp_path):
+    from flake8_unused_arguments import Options, Profiles
+
+    profiles = Profiles.parse(
+        """
+        tests/*, conftest.py: ignore-lambdas ignore-stub-functions
+        *.pyi: ignore-stub-functions; *_test.py: ignore-dunder
+        """,
+        str(tmp_path),
+    )
+    options = Options(ignore_overload=True)
+
+    assert profiles.get_options(str(tmp_path / "tests" / "a" / "test_a.py"), options) == (
+        Options(ignore_overload=True, ignore_lambdas=True, ignore_stubs=True)
+    )
+    # every matching profile applies
+    assert profiles.get_options(str(tmp_path / "tests" / "b_test.py"), options) == Options(
+        ignore_overload=True, ignore_lambdas=True, ignore_stubs=True, ignore_dunder_methods=True
+    )
+    assert profiles.get_options("other/conftest.py", options).ignore_lambdas
+    assert profiles.get_options("stubs/a.pyi", options) == replace(options, ignore_stubs=True)
+    assert profiles.get_options(str(tmp_path / "src" / "tests.py"), options) is options
+    # the options of a combination of profiles are reused
+    assert profiles.get_options("a.pyi", options) is profiles.get_options("b.pyi", options)
+
+    with pytest.raises(ValueError):
+        Profiles.parse("tests/*: ignore-everything")
+    with pytest.raises(ValueError):
+        Profiles.parse("tests/*")
+
+
+def test_plugin_profiles():
+    from flake8_unused_arguments import Plugin, Profiles
+
+    tree = ast.parse("f = lambda a: 1\n")
+    with patch.object(Plugin, "profiles", Profiles.parse("test_*.py: ignore-lambdas")):
+        assert list(Plugin(tree, "test_a.py").run()) == []
+        assert len(list(Plugin(tree, "a.py").run())) == 1
+
+
+def test_main_profiles(tmp_path, monkeypatch, capsys):
+    from flake8_unused_arguments.cli import main
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_a.py").write_text("f = lambda a: 1\n")
+    (tmp_path / "a.py").write_text("f = lambda a: 1\n")
+    args = ["--no-cache", "-j", "1"]
+
+    assert main(args + ["--unused-arguments-profiles", "tests/*: ignore-lambdas"]) == 1
+    assert capsys.readouterr().out == "./a.py:1:12: U100 Unused argument 'a'\n"
+    with pytest.raises(SystemExit):
+        main(args + ["--unused-arguments-profiles", "*: ignore-everything"])
+
+
+def test_flake8_invalid_profiles(tmp_path):
+    (tmp_path / "setup.cfg").write_text("[flake8]\nunused-arguments-profiles = *: bogus\n")
+    (tmp_path / "a.py").write_text("def foo(a): pass\n")
+    result = subprocess.run(
+        [sys.executable, "-m", "flake8", "a.py"],
+        cwd=str(tmp_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+    assert result.returncode == 1
+    assert "invalid unused-arguments-profiles: unknown options bogus" in result.stdout
+    assert "Traceback" not in result.stdout
+
+
+def test_plugin_statistics_file(tmp_path):
+    from flake8_unused_arguments import Plugin
+
+    statistics_file = str(tmp_path / "statistics.jsonl")
+    with patch.object(Plugin, "statistics_file", statistics_file):
+        for filename in ["a.py", "b.py"]:
+            results = list(Plugin(ast.parse("def foo(a): pass"), filename).run())
+            assert results == [(1, 8, "U100 Unused argument 'a'", "unused argument")]
+
+    with open(statistics_file) as f:
+        records = [json.loads(line) for line in f]
+    assert [(r["filename"], r["functions"], r["findings"]) for r in records] == [
+        ("a.py", 1, 1),
+        ("b.py", 1, 1),
+    ]
+
+
+def test_main_statistics(tmp_path, capsys):
+    from flake8_unused_arguments.cli import main
+
+    (tmp_path / "a.py").write_text("def foo(a):\n    pass\n")
+    statistics_file = tmp_path / "statistics.jsonl"
+
+    assert main([str(tmp_path / "a.py"), "--statistics", str(statistics_file), "--slowest", "1"]) == 1
+    output = capsys.readouterr()
+    assert output.out == "{}:1:9: U100 Unused argument 'a'\n".format(tmp_path / "a.py")
+    assert output.err.startswith("1 files in ")
+    assert "{}:1 foo".format(tmp_path / "a.py") in output.err
+    assert json.loads(statistics_file.read_text())["findings"] == 1
+
+
 def get_most_recent_tag() -> str:
     return (
         re.sub("^v", "", subprocess.check_output(["git", "describe", "--tags", "--abbrev=0"], text=True)